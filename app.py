@@ -1,28 +1,42 @@
 # app.py
 import streamlit as st
 import hashlib
-import sqlite3
 from datetime import datetime
-from pathlib import Path
 import sys
 import os
-import json
+import time
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), "src"))
 
 # Import your modules
-from src.matcher import calculate_detailed_match, get_match_interpretation
+from src.matcher import calculate_detailed_match, get_match_interpretation, set_model_cache, result_key
 from src.skill_gap import extract_skills
 from src.keyword_gap import extract_keywords
 from src.local_suggestions import generate_resume_bullets, get_skill_recommendations
 from src.resume_enhancer import generate_resume_enhancements, check_ats_compatibility
 from src.file_parser import extract_text_from_file
-from src.report_generator import save_match_report, generate_html_report
+from src.report_generator import render_match_report, render_html_report, archive_reports
+from src.job_queue import JobQueue
+from src.persistence import (save_analysis_to_db, load_analysis_history, load_analysis_details,
+                             HISTORY_PAGE_SIZE)
+from src.cache_utils import content_hash
+# Imported flat, like inside src, so the app and the pipeline share one registry
+from metrics import timed, start_exporters
 
 # Page config (ONLY RUNS ONCE AT THE VERY TOP)
 st.set_page_config(page_title="ResumeAlign", page_icon="🎯", layout="wide")
 
+# Share loaded models across sessions and reruns
+@st.cache_resource
+def cached_model(name, _loader):
+    return _loader()
+
+set_model_cache(cached_model)
+
+# Prometheus endpoint / metrics log, when RESUMEALIGN_METRICS is set
+start_exporters()
+
 # ============ SESSION STATE INITIALIZATION ============
 if 'resume' not in st.session_state: 
     st.session_state.resume = ""
@@ -38,89 +52,170 @@ if 'clear_counter' not in st.session_state:
     st.session_state.clear_counter = 0
 if 'analysis_history' not in st.session_state: 
     st.session_state.analysis_history = []
+if 'history_cursor' not in st.session_state: 
+    st.session_state.history_cursor = None
 if 'current_analysis_id' not in st.session_state: 
     st.session_state.current_analysis_id = None
+if 'pending_job' not in st.session_state: 
+    st.session_state.pending_job = None
 
 # ============ DATABASE SETUPS ============
-DB_DIR = Path("database")
-DB_DIR.mkdir(exist_ok=True)
-DB_FILE = DB_DIR / "resumealign.db"
-REPORTS_DIR = Path("reports")
-REPORTS_DIR.mkdir(exist_ok=True)
-
-def init_db():
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT, 
-        email TEXT UNIQUE NOT NULL, 
-        name TEXT NOT NULL, 
-        password TEXT NOT NULL, 
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
-    c.execute('''CREATE TABLE IF NOT EXISTS analysis_history (
-        id INTEGER PRIMARY KEY AUTOINCREMENT, 
-        user_email TEXT NOT NULL, 
-        analysis_id TEXT NOT NULL, 
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP, 
-        match_score REAL, 
-        job_title TEXT, 
-        company_name TEXT, 
-        report_path TEXT, 
-        html_report_path TEXT, 
-        resume_snippet TEXT, 
-        jd_snippet TEXT, 
-        matched_skills TEXT, 
-        missing_skills TEXT, 
-        matched_keywords TEXT, 
-        missing_keywords TEXT, 
-        semantic_matches TEXT,
-        FOREIGN KEY (user_email) REFERENCES users(email))''')
-    conn.commit()
-    conn.close()
-
-init_db()
+# Tables are created once per process when the connection pool opens
 
 def hash_pwd(p): 
     return hashlib.sha256(p.encode()).hexdigest()
 
-def save_analysis_to_db(user_email, analysis_id, match_score, job_title, company_name, 
-                        report_path, html_report_path, resume_snippet, jd_snippet, 
-                        matched_skills, missing_skills, matched_keywords, missing_keywords,
-                        semantic_matches):
-    try:
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-        c.execute('''INSERT INTO analysis_history 
-            (user_email, analysis_id, timestamp, match_score, job_title, company_name, 
-             report_path, html_report_path, resume_snippet, jd_snippet, 
-             matched_skills, missing_skills, matched_keywords, missing_keywords, semantic_matches) 
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''', 
-            (user_email, analysis_id, datetime.now(), match_score, job_title, company_name, 
-             str(report_path), str(html_report_path), resume_snippet[:200], jd_snippet[:200], 
-             json.dumps(list(matched_skills)), json.dumps(list(missing_skills)), 
-             json.dumps(list(matched_keywords)), json.dumps(list(missing_keywords)),
-             json.dumps(semantic_matches)))
-        conn.commit()
-        conn.close()
-        return True
-    except Exception as e:
-        print(f"Database save error: {e}")
-        return False
+def load_history_page(user_email):
+    """Append the next page of saved analyses (summaries only) to the session history"""
+    rows = load_analysis_history(user_email, before=st.session_state.history_cursor)
+    for h in rows:
+        st.session_state.analysis_history.append({
+            'id': h[1], 
+            'timestamp': h[2], 
+            'score': h[3], 
+            'job_title': h[4] or 'Unknown', 
+            'report_path': h[6], 
+            'html_report_path': h[7]
+        })
+    # Keyset cursor: (timestamp, row id) of the oldest row loaded so far
+    st.session_state.history_cursor = (rows[-1][2], rows[-1][0]) if len(rows) == HISTORY_PAGE_SIZE else None
+
+# ============ ANALYSIS JOBS ============
+# Seconds between checks on a running analysis
+POLL_INTERVAL = 0.5
 
-def load_analysis_history(user_email):
+# Seconds a finished analysis waits for its reports to be archived
+ARCHIVE_WAIT = 2
+
+@st.cache_resource
+def get_job_queue():
+    """One job queue shared by every session"""
+    return JobQueue()
+
+def get_report(r, kind):
+    """Render a report for the shown results on first use and keep it with them"""
+    reports = r.setdefault('reports', {})
+    if kind not in reports:
+        render = render_match_report if kind == "txt" else render_html_report
+        match_result = {'overall': r['score'], 'breakdown': r['breakdown']}
+        reports[kind] = render(match_result, set(r['missing_skills']), set(r['missing_keywords']), 
+                               "resume.txt", "job_description.txt").encode("utf-8")
+    return reports[kind]
+
+def run_analysis(resume_text, jd_text):
+    """Full analysis pipeline; runs on a job queue worker thread"""
+    with timed("analysis"):
+        return _run_analysis(resume_text, jd_text)
+
+def _run_analysis(resume_text, jd_text):
+    match_result = calculate_detailed_match(resume_text, jd_text)
+    
+    matched_skills = set(match_result["details"]["matched_skills"])
+    missing_skills = set(match_result["details"]["missing_skills"])
+    matched_keywords = set(match_result["details"]["matched_keywords"])
+    missing_keywords = set(match_result["details"]["missing_keywords"])
+    
+    # Get semantic matches from the enhanced matcher
+    semantic_matches = match_result["details"].get("semantic_keyword_matches", {})
+    partial_matches = match_result["details"].get("partial_keyword_matches", {})
+    skill_partial_matches = match_result["details"].get("skill_partial_matches", {})
+    
+    # Determine job title from JD
+    job_title = "Software Developer"
+    if "marketing" in jd_text.lower(): 
+        job_title = "Marketing Specialist"
+    elif "data" in jd_text.lower(): 
+        job_title = "Data Analyst"
+    elif "project" in jd_text.lower(): 
+        job_title = "Project Manager"
+    elif "sales" in jd_text.lower():
+        job_title = "Sales Representative"
+    elif "product" in jd_text.lower():
+        job_title = "Product Manager"
+    
+    with timed("suggestions"):
+        bullet_suggestions = generate_resume_bullets(list(missing_keywords)[:5], job_title=job_title)
+        skill_recommendations = get_skill_recommendations(list(missing_skills))
+        enhancements = generate_resume_enhancements(resume_text, jd_text, list(missing_skills)[:5])
+        ats_check = check_ats_compatibility(resume_text)
+    
+    # Reports are rendered in memory when displayed; disk copies are optional
+    # and stored under the analysis hash, so concurrent analyses never collide
+    report_key = result_key(resume_text, jd_text)
+    report_archive = archive_reports(match_result, missing_skills, missing_keywords, 
+                                     "resume.txt", "job_description.txt", key=report_key)
+    
+    return {
+        'score': match_result['overall'], 
+        'breakdown': match_result['breakdown'], 
+        'matched_skills': list(matched_skills), 
+        'missing_skills': list(missing_skills), 
+        'matched_keywords': list(matched_keywords), 
+        'missing_keywords': list(missing_keywords),
+        'semantic_matches': semantic_matches,
+        'partial_matches': partial_matches,
+        'skill_partial_matches': skill_partial_matches,
+        'bullet_suggestions': bullet_suggestions, 
+        'skill_recommendations': skill_recommendations, 
+        'enhancements': enhancements, 
+        'ats_check': ats_check, 
+        'interpretation': get_match_interpretation(match_result['overall']), 
+        'report_key': report_key,
+        'report_archive': report_archive, 
+        'job_title': job_title,
+        'jd_skills': match_result['details'].get('jd_skills', []),
+        'resume_years': match_result['details'].get('resume_years', 0),
+        'jd_years': match_result['details'].get('jd_years', 0)
+    }
+
+def archived_paths(report_archive):
+    """Paths of written report copies, or ("", "") if archiving is off, failed or still running"""
+    if report_archive is None:
+        return "", ""
     try:
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-        c.execute('''SELECT analysis_id, timestamp, match_score, job_title, company_name, 
-            report_path, html_report_path, matched_skills, missing_skills, 
-            matched_keywords, missing_keywords, semantic_matches 
-            FROM analysis_history WHERE user_email = ? ORDER BY timestamp DESC''', (user_email,))
-        history = c.fetchall()
-        conn.close()
-        return history
+        paths = report_archive.result(timeout=ARCHIVE_WAIT)
     except Exception as e:
-        print(f"Load history error: {e}")
-        return []
+        print(f"Report archive not recorded: {e!r}")
+        return "", ""
+    return paths or ("", "")
+
+def finish_analysis(analysis):
+    """Record a finished analysis in this session (history, DB, results)"""
+    # Job results are shared between sessions, so work on a copy
+    results = dict(analysis)
+    # Only point history at report files that were actually written
+    results['report_path'], results['html_report_path'] = archived_paths(results.pop('report_archive'))
+    analysis_id = f"analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{results['report_key'][:8]}"
+    results['analysis_id'] = analysis_id
+    
+    if st.session_state.user and st.session_state.user != "guest":
+        save_analysis_to_db(st.session_state.user, analysis_id, results['score'], 
+                           results['job_title'], "", results['report_path'], results['html_report_path'], 
+                           st.session_state.resume, st.session_state.jd, 
+                           results['matched_skills'], results['missing_skills'], 
+                           results['matched_keywords'], results['missing_keywords'],
+                           results['semantic_matches'])
+    
+    history_entry = {
+        'id': analysis_id, 
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M'), 
+        'score': results['score'], 
+        'job_title': results['job_title'], 
+        'report_path': results['report_path'], 
+        'html_report_path': results['html_report_path'], 
+        'matched_skills_count': len(results['matched_skills']), 
+        'missing_skills_count': len(results['missing_skills']), 
+        'matched_skills': results['matched_skills'], 
+        'missing_skills': results['missing_skills'], 
+        'matched_keywords': results['matched_keywords'], 
+        'missing_keywords': results['missing_keywords'],
+        'semantic_matches': results['semantic_matches'],
+        'partial_matches': results['partial_matches']
+    }
+    st.session_state.analysis_history.insert(0, history_entry)
+    st.session_state.current_analysis_id = analysis_id
+    st.session_state.results = results
+    st.session_state.analysis_done = True
 
 # ============ UI LAYOUT ============
 st.title("🎯 ResumeAlign")
@@ -168,95 +263,13 @@ col_b1, col_b2, col_b3 = st.columns(3)
 with col_b1:
     if st.button("🔍 ANALYZE MATCH", type="primary", use_container_width=True, key="analyze_button"):
         if st.session_state.resume and st.session_state.jd:
-            with st.spinner("🔬 Analyzing your resume against job description..."):
-                match_result = calculate_detailed_match(st.session_state.resume, st.session_state.jd)
-                
-                matched_skills = set(match_result["details"]["matched_skills"])
-                missing_skills = set(match_result["details"]["missing_skills"])
-                matched_keywords = set(match_result["details"]["matched_keywords"])
-                missing_keywords = set(match_result["details"]["missing_keywords"])
-                
-                # Get semantic matches from the enhanced matcher
-                semantic_matches = match_result["details"].get("semantic_keyword_matches", {})
-                partial_matches = match_result["details"].get("partial_keyword_matches", {})
-                skill_partial_matches = match_result["details"].get("skill_partial_matches", {})
-                
-                # Determine job title from JD
-                job_title = "Software Developer"
-                if "marketing" in st.session_state.jd.lower(): 
-                    job_title = "Marketing Specialist"
-                elif "data" in st.session_state.jd.lower(): 
-                    job_title = "Data Analyst"
-                elif "project" in st.session_state.jd.lower(): 
-                    job_title = "Project Manager"
-                elif "sales" in st.session_state.jd.lower():
-                    job_title = "Sales Representative"
-                elif "product" in st.session_state.jd.lower():
-                    job_title = "Product Manager"
-                
-                bullet_suggestions = generate_resume_bullets(list(missing_keywords)[:5], job_title=job_title)
-                skill_recommendations = get_skill_recommendations(list(missing_skills))
-                enhancements = generate_resume_enhancements(st.session_state.resume, st.session_state.jd, list(missing_skills)[:5])
-                ats_check = check_ats_compatibility(st.session_state.resume)
-                
-                analysis_id = f"analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                report_file = save_match_report(match_result, missing_skills, missing_keywords, 
-                                                "resume.txt", "job_description.txt", "reports")
-                html_report = generate_html_report(match_result, missing_skills, missing_keywords, 
-                                                   "resume.txt", "job_description.txt", "reports")
-                
-                if st.session_state.user and st.session_state.user != "guest":
-                    save_analysis_to_db(st.session_state.user, analysis_id, match_result['overall'], 
-                                       job_title, "", report_file, html_report, 
-                                       st.session_state.resume, st.session_state.jd, 
-                                       matched_skills, missing_skills, matched_keywords, missing_keywords,
-                                       semantic_matches)
-                
-                history_entry = {
-                    'id': analysis_id, 
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M'), 
-                    'score': match_result['overall'], 
-                    'job_title': job_title, 
-                    'report_path': str(report_file), 
-                    'html_report_path': str(html_report), 
-                    'matched_skills_count': len(matched_skills), 
-                    'missing_skills_count': len(missing_skills), 
-                    'matched_skills': list(matched_skills), 
-                    'missing_skills': list(missing_skills), 
-                    'matched_keywords': list(matched_keywords), 
-                    'missing_keywords': list(missing_keywords),
-                    'semantic_matches': semantic_matches,
-                    'partial_matches': partial_matches
-                }
-                st.session_state.analysis_history.insert(0, history_entry)
-                st.session_state.current_analysis_id = analysis_id
-                
-                st.session_state.results = {
-                    'score': match_result['overall'], 
-                    'breakdown': match_result['breakdown'], 
-                    'matched_skills': list(matched_skills), 
-                    'missing_skills': list(missing_skills), 
-                    'matched_keywords': list(matched_keywords), 
-                    'missing_keywords': list(missing_keywords),
-                    'semantic_matches': semantic_matches,
-                    'partial_matches': partial_matches,
-                    'skill_partial_matches': skill_partial_matches,
-                    'bullet_suggestions': bullet_suggestions, 
-                    'skill_recommendations': skill_recommendations, 
-                    'enhancements': enhancements, 
-                    'ats_check': ats_check, 
-                    'interpretation': get_match_interpretation(match_result['overall']), 
-                    'report_path': str(report_file), 
-                    'html_report_path': str(html_report), 
-                    'analysis_id': analysis_id, 
-                    'job_title': job_title,
-                    'jd_skills': match_result['details'].get('jd_skills', []),
-                    'resume_years': match_result['details'].get('resume_years', 0),
-                    'jd_years': match_result['details'].get('jd_years', 0)
-                }
-                st.session_state.analysis_done = True
-                st.success("✅ Analysis complete!")
-                st.rerun()
+            # Identical resume/JD pairs share one job, across sessions too
+            job_key = content_hash(st.session_state.resume, st.session_state.jd)
+            get_job_queue().submit(job_key, run_analysis, st.session_state.resume, st.session_state.jd)
+            st.session_state.pending_job = job_key
+            st.session_state.results = None
+            st.session_state.analysis_done = False
+            st.rerun()
         else:
             st.error("⚠️ Please provide both fields")
 
@@ -280,6 +293,7 @@ Requirements:
         
         st.session_state.results = None
         st.session_state.analysis_done = False
+        st.session_state.pending_job = None
         st.rerun()
 
 with col_b3:
@@ -288,9 +302,29 @@ with col_b3:
         st.session_state.jd = ""
         st.session_state.results = None
         st.session_state.analysis_done = False
+        st.session_state.pending_job = None
         st.session_state.clear_counter += 1
         st.rerun()
 
+# ============ PENDING ANALYSIS ============
+if st.session_state.pending_job:
+    job_queue = get_job_queue()
+    job_status = job_queue.status(st.session_state.pending_job)
+    
+    if job_status == "done":
+        finish_analysis(job_queue.result(st.session_state.pending_job))
+        st.session_state.pending_job = None
+        st.success("✅ Analysis complete!")
+    elif job_status == "failed":
+        st.error(f"❌ Analysis failed: {job_queue.error(st.session_state.pending_job)}")
+        st.session_state.pending_job = None
+    elif job_status is None:
+        st.warning("⚠️ The analysis expired before it finished, please run it again")
+        st.session_state.pending_job = None
+    else:
+        st.info("🔬 Analyzing your resume against job description... "
+                f"({'queued' if job_status == 'pending' else 'running'})")
+
 # ============ DISPLAY RESULTS VISUALS ============
 if st.session_state.results and st.session_state.analysis_done:
     r = st.session_state.results
@@ -312,17 +346,11 @@ if st.session_state.results and st.session_state.analysis_done:
     
     col_d1, col_d2 = st.columns(2)
     with col_d1:
-        if 'report_path' in r and Path(r['report_path']).exists():
-            with open(r['report_path'], 'r', encoding='utf-8') as f: 
-                report_content = f.read()
-            st.download_button("📄 Download Text Report", report_content, 
-                             file_name="match_report.txt", mime="text/plain", use_container_width=True)
+        st.download_button("📄 Download Text Report", get_report(r, "txt"), 
+                         file_name="match_report.txt", mime="text/plain", use_container_width=True)
     with col_d2:
-        if 'html_report_path' in r and Path(r['html_report_path']).exists():
-            with open(r['html_report_path'], 'r', encoding='utf-8') as f: 
-                html_content = f.read()
-            st.download_button("📊 Download HTML Report", html_content, 
-                             file_name="match_report.html", mime="text/html", use_container_width=True)
+        st.download_button("📊 Download HTML Report", get_report(r, "html"), 
+                         file_name="match_report.html", mime="text/html", use_container_width=True)
     
     st.markdown("---")
     col_m1, col_m2, col_m3, col_m4 = st.columns(4)
@@ -501,26 +529,9 @@ with st.sidebar:
                 if st.form_submit_button("LOGIN", use_container_width=True):
                     if email and password:
                         st.session_state.user = email
-                        history = load_analysis_history(email)
                         st.session_state.analysis_history = []
-                        for h in history:
-                            # Parse semantic matches from JSON
-                            semantic_matches = {}
-                            try:
-                                if h[11]:  # semantic_matches column
-                                    semantic_matches = json.loads(h[11])
-                            except:
-                                pass
-                            
-                            st.session_state.analysis_history.append({
-                                'id': h[0], 
-                                'timestamp': h[1], 
-                                'score': h[2], 
-                                'job_title': h[3] or 'Unknown', 
-                                'report_path': h[5], 
-                                'html_report_path': h[6],
-                                'semantic_matches': semantic_matches
-                            })
+                        st.session_state.history_cursor = None
+                        load_history_page(email)
                         st.success(f"Welcome back, {email.split('@')[0]}!")
                         st.rerun()
         
@@ -534,6 +545,7 @@ with st.sidebar:
                         # In production, hash password and save to DB
                         st.session_state.user = email
                         st.session_state.analysis_history = []
+                        st.session_state.history_cursor = None
                         st.success("Account created successfully!")
                         st.rerun()
         
@@ -548,19 +560,31 @@ with st.sidebar:
         if st.session_state.user != "guest" and st.session_state.analysis_history:
             st.markdown("---")
             st.subheader("📜 RECENT ANALYSES")
-            for analysis in st.session_state.analysis_history[:5]:
+            for idx, analysis in enumerate(st.session_state.analysis_history):
                 with st.expander(f"📋 {analysis['job_title']} - {analysis['score']}%"):
                     st.write(f"📅 {analysis['timestamp']}")
+                    # Saved analyses load their skill/keyword lists only when asked
+                    if 'matched_skills' not in analysis:
+                        if st.button("Show details", key=f"details_{idx}_{analysis['id']}"):
+                            analysis.update(load_analysis_details(st.session_state.user, analysis['id']) or {})
+                    if 'matched_skills' in analysis:
+                        st.caption(f"✅ {len(analysis['matched_skills'])} skills matched, "
+                                   f"❌ {len(analysis['missing_skills'])} missing")
                     if analysis.get('semantic_matches'):
                         st.caption(f"✨ {len(analysis['semantic_matches'])} semantic matches found")
-                    if st.button("Load", key=f"load_{analysis['id']}"):
-                        st.info("Load functionality coming soon")
+            
+            if st.session_state.history_cursor:
+                if st.button("⬇️ Load more", use_container_width=True, key="history_more"):
+                    load_history_page(st.session_state.user)
+                    st.rerun()
         
         if st.button("🚪 LOGOUT", use_container_width=True, type="primary"):
             st.session_state.user = None
             st.session_state.analysis_history = []
+            st.session_state.history_cursor = None
             st.session_state.results = None
             st.session_state.analysis_done = False
+            st.session_state.pending_job = None
             st.rerun()
     
     st.markdown("---")
@@ -586,4 +610,10 @@ with st.sidebar:
 
 # ============ FOOTER ============
 st.markdown("---")
-st.caption("💡 **Pro tip:** Log in to save your analysis history and track your progress over time!")
\ No newline at end of file
+st.caption("💡 **Pro tip:** Log in to save your analysis history and track your progress over time!")
+
+# ============ POLL RUNNING ANALYSIS ============
+# The page is fully drawn; check back shortly (any user input interrupts this)
+if st.session_state.pending_job:
+    time.sleep(POLL_INTERVAL)
+    st.rerun()
@@ -0,0 +1,330 @@
+# benchmarks/bench_pipeline.py
+"""
+Per-stage timings of the matching pipeline (calculate_detailed_match).
+
+Times clean_text, extract_skills, extract_keywords,
+match_keywords_with_context, extract_experience_years and
+calculate_similarity separately, plus the whole match, on small / medium /
+large synthetic resume-JD pairs and one realistic pair. Inputs are seeded,
+so runs on different commits see identical documents.
+
+Every timed call starts cold: the clean_text memos, keyword_gap's
+per-word feature cache, the result cache and the embedding cache
+(memory-only here, so nothing on disk is read or written) are cleared
+before each repeat. Caches a commit does not have yet are skipped, so the
+same script can be run on older commits for --compare. The similarity
+stage and the full match are skipped when the sentence-transformers
+model cannot be loaded (or with --no-model).
+
+Run:
+    python benchmarks/bench_pipeline.py --output before.json
+    python benchmarks/bench_pipeline.py --output after.json --compare before.json
+
+--compare exits with status 1 when a stage's median got slower than
+--threshold times the baseline.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import inspect
+import platform
+import argparse
+import statistics
+import subprocess
+from datetime import datetime
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import matcher
+import keyword_gap
+import text_cleaner
+from skill_gap import extract_skills
+from keyword_gap import extract_keywords, match_keywords_with_context
+
+# =====================================================
+# DOCUMENTS
+# =====================================================
+
+RESUME_WORDS = ("managed cross functional team delivering data analytics projects "
+                "increased revenue by 25 percent using python sql tableau and excel "
+                "built etl pipelines with airflow and aws redshift for reporting "
+                "led customer acquisition campaigns across google ads seo and hubspot "
+                "stakeholder communication agile scrum jira budget forecasting").split()
+
+JD_WORDS = ("we are seeking a data analyst to join our growing analytics team "
+            "requirements include sql python power bi tableau and statistics "
+            "experience with aws snowflake dbt and stakeholder management "
+            "you will build dashboards define kpis and support marketing decisions").split()
+
+EXPERIENCE_LINES = ("{n}+ years of experience in data analysis",
+                    "{n} years experience with sql and reporting",
+                    "minimum {n} years in a similar role")
+
+# Approximate word counts per document: (resume, jd)
+SIZES = {
+    "small": (150, 80),
+    "medium": (600, 250),
+    "large": (3000, 900),
+}
+
+REALISTIC_RESUME = """
+Jordan Lee | Data Analyst | jordan.lee@example.com | linkedin.com/in/jordanlee
+
+SUMMARY
+Data analyst with 4 years of experience turning sales and marketing data into
+decisions. Strong in SQL, Python (pandas) and Tableau; comfortable owning a
+metric from raw tables to the executive dashboard.
+
+EXPERIENCE
+Senior Data Analyst, Northwind Retail (2022 - present)
+• Built 15 Tableau dashboards used weekly by 120+ sales and marketing staff
+• Rewrote the revenue reporting pipeline in SQL and Airflow, cutting refresh time from 6 hours to 40 minutes
+• Designed A/B tests for email campaigns; a subject-line test raised click-through by 18%
+• Partnered with finance on quarterly forecasting in Excel and Python
+
+Data Analyst, Contoso Marketing (2020 - 2022)
+• Automated campaign performance reports for Google Ads and Meta with Python
+• Maintained customer segmentation models (k-means, RFM) in scikit-learn
+• Cleaned and documented a 40-table Snowflake warehouse
+
+EDUCATION
+B.S. Statistics, State University, 2020
+
+SKILLS
+SQL, Python, pandas, Tableau, Power BI, Excel, Airflow, Snowflake, AWS,
+A/B testing, statistics, stakeholder communication, Agile
+"""
+
+REALISTIC_JD = """
+Data Analyst - Marketing Analytics (Full-time, Hybrid)
+
+About the role
+We are seeking a data analyst to join our marketing analytics team. You will
+own reporting for paid and organic channels and help the team decide where
+to invest.
+
+Responsibilities
+- Build and maintain dashboards in Power BI or Tableau
+- Write SQL against our Snowflake warehouse and model data with dbt
+- Define KPIs with stakeholders across marketing, sales and finance
+- Design and analyse A/B tests and campaign experiments
+
+Requirements
+- 3+ years of experience as a data analyst
+- Strong SQL and Python; experience with pandas
+- Experience with a BI tool (Power BI preferred)
+- Understanding of statistics and experimental design
+- Clear communication with non-technical stakeholders
+
+Nice to have: dbt, Airflow, Google Analytics 4, Looker
+"""
+
+def make_document(words, n_words, seed):
+    """Seeded bullet-style document of about n_words words"""
+    rng = random.Random(seed)
+    lines = []
+    count = 0
+    while count < n_words:
+        if rng.random() < 0.1:
+            line = rng.choice(EXPERIENCE_LINES).format(n=rng.randint(1, 10))
+        else:
+            line = " ".join(rng.choice(words) for _ in range(rng.randint(8, 14)))
+        lines.append(rng.choice(["• ", "- ", ""]) + line + rng.choice([".", ""]))
+        count += len(line.split())
+    return "\n".join(lines)
+
+def make_inputs():
+    inputs = {}
+    for i, (size, (resume_words, jd_words)) in enumerate(SIZES.items()):
+        inputs[size] = (make_document(RESUME_WORDS, resume_words, seed=2 * i),
+                        make_document(JD_WORDS, jd_words, seed=2 * i + 1))
+    inputs["realistic"] = (REALISTIC_RESUME, REALISTIC_JD)
+    return inputs
+
+# =====================================================
+# TIMING
+# =====================================================
+
+def reset_caches():
+    """Drop every memo the pipeline keeps, so each call does the full work"""
+    for memo in (getattr(text_cleaner, "_clean_memo", None),
+                 getattr(text_cleaner, "_keyword_memo", None)):
+        if memo is not None:
+            memo.clear()
+    
+    word_features = getattr(keyword_gap, "_word_features", None)
+    if word_features is not None:
+        word_features.cache_clear()
+    
+    get_result_cache = getattr(matcher, "get_result_cache", None)
+    if get_result_cache is not None:
+        get_result_cache().clear()
+    
+    embedding_cache = getattr(matcher, "_embedding_cache", None)
+    if embedding_cache is not None:
+        embedding_cache.memory.clear()
+
+# Older commits re-clean inside extract_keywords and have no such flag
+_KEYWORD_KWARGS = ({"already_clean": True}
+                   if "already_clean" in inspect.signature(extract_keywords).parameters else {})
+
+def keywords_of(clean):
+    """extract_keywords on cleaned text, as the pipeline calls it on this commit"""
+    return extract_keywords(clean, top_n=40, **_KEYWORD_KWARGS)
+
+def measure(func, repeats, warmup=2):
+    """Timing summary (ms) of func() over repeats cold calls"""
+    for _ in range(warmup):
+        reset_caches()
+        func()
+
+    samples = []
+    for _ in range(repeats):
+        reset_caches()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    return {
+        "min_ms": samples[0],
+        "median_ms": statistics.median(samples),
+        "mean_ms": statistics.fmean(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(0.95 * len(samples)))],
+        "max_ms": samples[-1],
+        "repeats": repeats,
+    }
+
+def model_available():
+    """Load the embedding model once; False if that is not possible here"""
+    try:
+        matcher.get_model()
+        return True
+    except Exception as e:
+        print(f"Similarity stage skipped, model unavailable: {e}")
+        return False
+
+def bench_pair(resume, jd, repeats, with_model):
+    """Stage timings for one resume/JD pair, inputs prepared like calculate_detailed_match"""
+    resume_clean = text_cleaner.clean_text(resume)
+    jd_clean = text_cleaner.clean_text(jd)
+    resume_skills = extract_skills(resume_clean)
+    jd_skills = extract_skills(jd_clean)
+    resume_keywords = keywords_of(resume_clean) - {s.lower() for s in resume_skills}
+    jd_keywords = keywords_of(jd_clean) - {s.lower() for s in jd_skills}
+
+    stages = {
+        "clean_text": lambda: (text_cleaner.clean_text(resume), text_cleaner.clean_text(jd)),
+        "extract_skills": lambda: (extract_skills(resume_clean), extract_skills(jd_clean)),
+        "extract_keywords": lambda: (keywords_of(resume_clean), keywords_of(jd_clean)),
+        "match_keywords_with_context": lambda: match_keywords_with_context(
+            resume_keywords, jd_keywords, resume_clean, jd_clean),
+        "extract_experience_years": lambda: (matcher.extract_experience_years(resume),
+                                             matcher.extract_experience_years(jd)),
+    }
+    if with_model:
+        stages["calculate_similarity"] = lambda: matcher.calculate_similarity(resume_clean, jd_clean)
+        stages["calculate_detailed_match"] = lambda: matcher.calculate_detailed_match(resume, jd)
+
+    results = {"resume_words": len(resume.split()), "jd_words": len(jd.split())}
+    for name, func in stages.items():
+        results[name] = measure(func, repeats)
+    return results
+
+# =====================================================
+# REPORTING
+# =====================================================
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_results(results):
+    for size, stages in results.items():
+        print(f"\n{size} (resume ~{stages['resume_words']} words, JD ~{stages['jd_words']} words)")
+        for name, timing in stages.items():
+            if isinstance(timing, dict):
+                print(f"  {name:<28}{timing['median_ms']:>10.3f} ms  (p95 {timing['p95_ms']:.3f})")
+
+def compare(results, baseline, threshold):
+    """Print median ratios against a baseline run; return the regressed stages"""
+    regressions = []
+    print(f"\nCompared with {baseline['meta'].get('commit') or 'baseline'} (median, new / old):")
+    for size, stages in results.items():
+        for name, timing in stages.items():
+            old = baseline["results"].get(size, {}).get(name)
+            if not isinstance(timing, dict) or not isinstance(old, dict):
+                continue
+            ratio = timing["median_ms"] / max(old["median_ms"], 1e-9)
+            flag = "  REGRESSION" if ratio > threshold else ""
+            print(f"  {size:<10}{name:<28}{old['median_ms']:>10.3f} -> {timing['median_ms']:>10.3f} ms"
+                  f"  {ratio:5.2f}x{flag}")
+            if flag:
+                regressions.append(f"{size}/{name}")
+    return regressions
+
+# =====================================================
+# MAIN
+# =====================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time each stage of the matching pipeline")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--sizes", nargs="*", default=list(SIZES) + ["realistic"])
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="median slowdown ratio reported as a regression")
+    parser.add_argument("--no-model", action="store_true", help="skip the embedding model stages")
+    args = parser.parse_args()
+
+    with_model = False
+    if not args.no_model:
+        # Memory-only embedding cache: similarity timings measure the model,
+        # and the benchmark never touches the on-disk cache (embedding_cache
+        # needs numpy, so this stays out of --no-model runs)
+        try:
+            from embedding_cache import EmbeddingCache
+            matcher._embedding_cache = EmbeddingCache(db_path=None)
+            with_model = model_available()
+        except ImportError as e:
+            print(f"Similarity stage skipped, embedding cache unavailable: {e}")
+
+    inputs = make_inputs()
+    results = {size: bench_pair(*inputs[size], args.repeats, with_model) for size in args.sizes}
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "model": matcher.MODEL_NAME if with_model else None,
+            "backend": getattr(matcher, "INFERENCE_BACKEND", None) or
+                       getattr(sys.modules.get("model_backends"), "INFERENCE_BACKEND", None),
+            "similarity_mode": getattr(matcher, "SIMILARITY_MODE", None),
+            "repeats": args.repeats,
+        },
+        "results": results,
+    }
+
+    print_results(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) slower than {args.threshold}x: {', '.join(regressions)}")
+            sys.exit(1)
@@ -0,0 +1,93 @@
+# benchmarks/bench_text_cleaner.py
+"""
+Throughput of clean_text / clean_text_for_keywords on ~10-page documents.
+
+Compares the original multi-pass cleaner (copied below) with the current
+precompiled one, both uncached and on memo hits.
+
+Run: python benchmarks/bench_text_cleaner.py
+"""
+
+import os
+import re
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import text_cleaner
+
+# =====================================================
+# ORIGINAL IMPLEMENTATION (for comparison)
+# =====================================================
+
+def legacy_clean_text(text):
+    if not text:
+        return ""
+    text = re.sub(r'[^\x00-\x7F]+', ' ', text)
+    text = re.sub(r'\x00', ' ', text)
+    text = re.sub(r'[•·●■◆▪►○●□]', ' ', text)
+    text = re.sub(r'[\|\/\\]', ' ', text)
+    text = text.replace('\r\n', '\n')
+    text = text.replace('\r', '\n')
+    text = re.sub(r'\s+[a-zA-Z]\s+', ' ', text)
+    text = re.sub(r'\s+\d+\s+', ' ', text)
+    text = re.sub(r'(\w+)(time)(\w+)', r'\1 \2 \3', text)
+    text = re.sub(r'(\w+)(summary)(\w+)', r'\1 \2 \3', text)
+    text = re.sub(r'(\w+)(position)(\w+)', r'\1 \2 \3', text)
+    text = re.sub(r'(\w+)(manager)(\w+)', r'\1 \2 \3', text)
+    text = re.sub(r'(\w+)(location)(\w+)', r'\1 \2 \3', text)
+    text = re.sub(r'(\w+)(department)(\w+)', r'\1 \2 \3', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = text.strip()
+    text = re.sub(r'\.([A-Z])', r'. \1', text)
+    return text.lower()
+
+# =====================================================
+# SYNTHETIC 10-PAGE DOCUMENT
+# =====================================================
+
+WORDS = ("managed cross functional team delivering data analytics projects "
+         "increased revenue by 25 percent using python sql tableau and excel "
+         "led customer acquisition campaigns across google ads and meta "
+         "fulltime position summary projectmanager location department").split()
+
+def make_document(pages=10, words_per_page=500, seed=0):
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(pages * words_per_page // 10):
+        bullet = rng.choice(["• ", "● ", "- ", "| ", ""])
+        lines.append(bullet + " ".join(rng.choice(WORDS) for _ in range(10)) + rng.choice([".", "", " / 2024"]))
+    return "\r\n".join(lines)
+
+def throughput(func, documents, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for doc in documents:
+            func(doc)
+        best = min(best, time.perf_counter() - start)
+    return len(documents) / best
+
+# =====================================================
+# MAIN
+# =====================================================
+
+if __name__ == "__main__":
+    documents = [make_document(seed=i) for i in range(20)]
+    words = sum(len(d.split()) for d in documents) // len(documents)
+    print(f"{len(documents)} documents, ~{words} words each")
+
+    for doc in documents:
+        assert text_cleaner._clean_text(doc) == legacy_clean_text(doc)
+
+    legacy = throughput(legacy_clean_text, documents)
+    compiled = throughput(text_cleaner._clean_text, documents)
+    text_cleaner.clean_text(documents[0])
+    memo = throughput(lambda _: text_cleaner.clean_text(documents[0]), documents)
+
+    print(f"clean_text  legacy      {legacy:10.1f} docs/s")
+    print(f"clean_text  compiled    {compiled:10.1f} docs/s  ({compiled / legacy:.1f}x)")
+    print(f"clean_text  memo hit    {memo:10.1f} docs/s  ({memo / legacy:.1f}x)")
+
@@ -0,0 +1,183 @@
+# src/bulk_ingest.py
+"""
+Bulk extraction of resumes/JDs from a directory or a .zip archive.
+
+Every PDF, DOCX and TXT file is extracted in a pool of worker processes and
+collected into one table (one row per file: metadata, raw text and cleaned
+text) that can be written to Parquet or CSV for batch matching.
+"""
+
+import os
+import zipfile
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import file_parser
+from file_parser import extract_text_from_bytes, PDF_TYPE, DOCX_TYPE
+from text_cleaner import clean_text
+
+# =====================================================
+# SETTINGS
+# =====================================================
+
+FILE_TYPES = {
+    ".pdf": PDF_TYPE,
+    ".docx": DOCX_TYPE,
+    ".txt": "text/plain",
+}
+
+MAX_WORKERS = os.cpu_count() or 1
+CHUNK_SIZE = 8
+
+COLUMNS = ["source", "name", "ext", "bytes", "sha256",
+           "n_chars", "n_words", "error", "text", "clean_text"]
+
+# =====================================================
+# DISCOVERY
+# =====================================================
+
+def _wanted(name):
+    base = os.path.basename(name)
+    if not base or base.startswith((".", "~$")) or "__MACOSX" in name:
+        return False
+    return os.path.splitext(base)[1].lower() in FILE_TYPES
+
+def find_documents(path):
+    """
+    List (source, name, archive) tuples for the supported files under path.
+
+    path may be a directory (searched recursively) or a .zip archive; for
+    archive members source is the zip file and name the member inside it.
+    """
+    if os.path.isdir(path):
+        found = []
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                full = os.path.join(root, name)
+                if _wanted(full):
+                    found.append((full, os.path.relpath(full, path), False))
+        return found
+
+    # A .docx is a zip too, so only check for an archive after the suffix
+    if not _wanted(path) and zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            return [(path, info.filename, True) for info in archive.infolist()
+                    if not info.is_dir() and _wanted(info.filename)]
+
+    if _wanted(path):
+        return [(path, os.path.basename(path), False)]
+    raise ValueError(f"Not a directory, zip archive or supported file: {path}")
+
+# =====================================================
+# EXTRACTION (runs in worker processes)
+# =====================================================
+
+def _init_worker():
+    # Files are already spread over processes, so PDFs stay single-process
+    file_parser.MAX_WORKERS = 1
+
+def _read_document(source, name, archive):
+    if archive:
+        with zipfile.ZipFile(source) as zf:
+            return zf.read(name)
+    with open(source, "rb") as f:
+        return f.read()
+
+def ingest_document(source, name, archive=False):
+    """Extract one document and return its row as a dict"""
+    ext = os.path.splitext(name)[1].lower()
+    row = {"source": source, "name": name, "ext": ext, "bytes": 0, "sha256": "",
+           "n_chars": 0, "n_words": 0, "error": "", "text": "", "clean_text": ""}
+
+    try:
+        data = _read_document(source, name, archive)
+        row["bytes"] = len(data)
+        row["sha256"] = hashlib.sha256(data).hexdigest()
+        text = extract_text_from_bytes(data, FILE_TYPES[ext])
+    except Exception as e:
+        row["error"] = str(e)
+        return row
+
+    # The parsers report failures as text rather than raising
+    if text.startswith("Error extracting"):
+        row["error"] = text
+        return row
+
+    row["text"] = text
+    row["clean_text"] = clean_text(text)
+    row["n_chars"] = len(text)
+    row["n_words"] = len(text.split())
+    return row
+
+def _ingest_task(task):
+    return ingest_document(*task)
+
+# =====================================================
+# BULK INGEST
+# =====================================================
+
+def ingest(path, output=None, workers=None):
+    """
+    Extract every supported document under path into a DataFrame.
+
+    With output set, the table is also written there: Parquet for a
+    .parquet path (needs pyarrow or fastparquet), CSV otherwise.
+    """
+    tasks = find_documents(path)
+    workers = MAX_WORKERS if workers is None else workers
+
+    if workers > 1 and len(tasks) > 1:
+        # Same start method as file_parser's page pool: never fork the caller
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 mp_context=file_parser.get_pool_context()) as pool:
+            rows = list(pool.map(_ingest_task, tasks, chunksize=CHUNK_SIZE))
+    else:
+        rows = [_ingest_task(task) for task in tasks]
+
+    frame = pd.DataFrame(rows, columns=COLUMNS)
+    if output:
+        write_table(frame, output)
+    return frame
+
+def write_table(frame, output):
+    """Write an ingest table as Parquet (.parquet) or CSV"""
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    if output.lower().endswith(".parquet"):
+        try:
+            frame.to_parquet(output, index=False)
+        except ImportError as e:
+            raise ImportError(
+                "Writing Parquet needs pyarrow or fastparquet; "
+                "install one or write a .csv file instead"
+            ) from e
+    else:
+        frame.to_csv(output, index=False)
+
+# =====================================================
+# COMMAND LINE
+# =====================================================
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Extract a folder or zip of resumes/JDs into one table")
+    parser.add_argument("path", help="directory, .zip archive or single file")
+    parser.add_argument("-o", "--output", default="ingested.parquet",
+                        help="output file (.parquet or .csv)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        table = ingest(args.path, args.output, workers=args.workers)
+    except (ImportError, ValueError) as e:
+        sys.exit(f"Error: {e}")
+
+    failed = int((table["error"] != "").sum())
+    print(f"Ingested {len(table)} files ({failed} failed) -> {args.output} "
+          f"in {time.perf_counter() - start:.2f}s")
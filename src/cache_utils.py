@@ -0,0 +1,127 @@
+# src/cache_utils.py
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+# =====================================================
+# CACHE LOCATION
+# =====================================================
+
+CACHE_DIR = os.environ.get("RESUMEALIGN_CACHE_DIR", "cache")
+
+# =====================================================
+# CONTENT HASHING
+# =====================================================
+
+def content_hash(*parts):
+    """Return a stable SHA-256 hex digest over one or more text/bytes parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        # Length-prefix each part so ("ab", "c") and ("a", "bc") differ
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.hexdigest()
+
+# =====================================================
+# IN-MEMORY LRU
+# =====================================================
+
+class LRUCache:
+    """Thread-safe in-memory LRU cache with hit/miss counters"""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Return size and hit/miss counters"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0
+            }
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+# =====================================================
+# IN-MEMORY LRU WITH EXPIRY
+# =====================================================
+
+class TTLCache(LRUCache):
+    """LRUCache whose entries also expire ttl seconds after they were stored"""
+
+    def __init__(self, maxsize=256, ttl=3600):
+        super().__init__(maxsize)
+        self.ttl = ttl
+        self.expired = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if time.monotonic() < expires_at:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expired += 1
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        super().put(key, (time.monotonic() + self.ttl, value))
+
+    def clear(self):
+        super().clear()
+        self.expired = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and time.monotonic() < entry[0]
+
+    def stats(self):
+        stats = super().stats()
+        stats["ttl"] = self.ttl
+        stats["expired"] = self.expired
+        return stats
@@ -0,0 +1,113 @@
+# src/embedding_cache.py
+import os
+import sqlite3
+import threading
+import numpy as np
+
+from cache_utils import CACHE_DIR, LRUCache, content_hash
+
+# =====================================================
+# SETTINGS
+# =====================================================
+
+EMBEDDING_DB_FILE = os.path.join(CACHE_DIR, "embeddings.sqlite")
+MEMORY_CACHE_SIZE = 2048
+
+# =====================================================
+# TWO-TIER EMBEDDING CACHE
+# =====================================================
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache.
+
+    Embeddings are keyed by SHA-256(model name + text). Lookups hit an
+    in-memory LRU first, then an SQLite table of float32 blobs. Pass
+    db_path=None for a memory-only cache.
+    """
+
+    def __init__(self, db_path=EMBEDDING_DB_FILE, memory_size=MEMORY_CACHE_SIZE):
+        self.memory = LRUCache(maxsize=memory_size)
+        self.db_path = db_path
+        self._conn = None
+        self._lock = threading.Lock()
+
+        if db_path:
+            try:
+                os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+                self._conn = sqlite3.connect(db_path, check_same_thread=False)
+                self._conn.execute('''CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    dim INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+                self._conn.commit()
+            except (sqlite3.Error, OSError) as e:
+                # e.g. an unwritable cache directory: keep the memory tier only
+                print(f"Embedding cache disabled on disk: {e}")
+                self._conn = None
+
+    @staticmethod
+    def make_key(text, model_name):
+        return content_hash(model_name, text)
+
+    def get_many(self, texts, model_name):
+        """Return a list of cached vectors (or None) aligned with texts"""
+        keys = [self.make_key(text, model_name) for text in texts]
+        vectors = [self.memory.get(key) for key in keys]
+
+        pending = {key for key, vector in zip(keys, vectors) if vector is None}
+        if pending and self._conn is not None:
+            found = self._read_disk(pending)
+            for key, vector in found.items():
+                self.memory.put(key, vector)
+            vectors = [found.get(key) if vector is None else vector
+                       for key, vector in zip(keys, vectors)]
+
+        return vectors
+
+    def put_many(self, texts, vectors, model_name):
+        """Store vectors for texts in both tiers"""
+        rows = []
+        for text, vector in zip(texts, vectors):
+            vector = np.asarray(vector, dtype=np.float32)
+            key = self.make_key(text, model_name)
+            self.memory.put(key, vector)
+            rows.append((key, model_name, int(vector.shape[-1]), vector.tobytes()))
+
+        if rows and self._conn is not None:
+            try:
+                with self._lock:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, model, dim, vector) VALUES (?, ?, ?, ?)",
+                        rows
+                    )
+                    self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"Embedding cache write error: {e}")
+
+    def get(self, text, model_name):
+        return self.get_many([text], model_name)[0]
+
+    def put(self, text, vector, model_name):
+        self.put_many([text], [vector], model_name)
+
+    def _read_disk(self, keys):
+        keys = list(keys)
+        found = {}
+        try:
+            with self._lock:
+                # Stay under SQLite's bound-parameter limit
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = self._conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                        chunk
+                    ).fetchall()
+                    for key, blob in rows:
+                        found[key] = np.frombuffer(blob, dtype=np.float32)
+        except sqlite3.Error as e:
+            print(f"Embedding cache read error: {e}")
+        return found
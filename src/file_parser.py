@@ -1,36 +1,220 @@
 # src/file_parser.py - FIXED VERSION
+import io
+import os
+import hashlib
+import multiprocessing
 import PyPDF2
 import docx
-import io
+from concurrent.futures import ProcessPoolExecutor
+
+from cache_utils import LRUCache
+from metrics import timed, register_cache
+
+# =====================================================
+# SETTINGS
+# =====================================================
+
+# PDFs with at least this many pages are split across worker processes
+PARALLEL_PAGE_THRESHOLD = 24
+PAGES_PER_TASK = 6
+MAX_WORKERS = min(4, os.cpu_count() or 1)
 
-def extract_text_from_file(uploaded_file):
+PDF_TYPE = "application/pdf"
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# Extracted text is cached by SHA-256 of the file bytes: always in memory,
+# and also on disk when RESUMEALIGN_EXTRACT_CACHE_DIR is set
+EXTRACTION_MEMORY_SIZE = 64
+EXTRACTION_CACHE_DIR = os.environ.get("RESUMEALIGN_EXTRACT_CACHE_DIR")
+
+_extraction_cache = LRUCache(maxsize=EXTRACTION_MEMORY_SIZE)
+
+def extract_text_from_file(uploaded_file, max_pages=None, max_words=None):
     """Extract text from PDF, DOCX, or TXT"""
-    
-    # Check file type
-    if uploaded_file.type == "application/pdf":
-        return extract_text_from_pdf(uploaded_file)
-    elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-        return extract_text_from_docx(uploaded_file)
-    else:  # txt
-        return uploaded_file.read().decode('utf-8')
-
-def extract_text_from_pdf(file):
+    return extract_text_from_bytes(_read_bytes(uploaded_file), uploaded_file.type,
+                                   max_pages=max_pages, max_words=max_words)
+
+def extract_text_from_bytes(data, file_type, max_pages=None, max_words=None):
+    """Extract text from raw file bytes, reusing earlier results for identical bytes"""
+    kind = "pdf" if file_type == PDF_TYPE else "docx" if file_type == DOCX_TYPE else "txt"
+    key = f"{hashlib.sha256(data).hexdigest()}-{kind}-p{max_pages}-w{max_words}"
+
+    text = _cache_get(key)
+    if text is not None:
+        return text
+
+    # Check file type (extraction errors are returned as text, not cached)
+    with timed(f"parse_{kind}"):
+        if kind == "pdf":
+            try:
+                pages = iter_pdf_pages(data, max_pages=max_pages, max_words=max_words)
+                text = "".join(page + "\n" for page in pages if page)
+            except Exception as e:
+                return f"Error extracting PDF: {str(e)}"
+        elif kind == "docx":
+            try:
+                text = _docx_text(io.BytesIO(data))
+            except Exception as e:
+                return f"Error extracting DOCX: {str(e)}"
+        else:  # txt
+            text = data.decode('utf-8')
+
+    _cache_put(key, text)
+    return text
+
+# =====================================================
+# EXTRACTION CACHE
+# =====================================================
+
+def configure_extraction_cache(directory=None, memory_size=None):
+    """Set the on-disk cache directory (None disables it) and/or memory size"""
+    global EXTRACTION_CACHE_DIR, _extraction_cache
+    EXTRACTION_CACHE_DIR = directory
+    if memory_size is not None:
+        _extraction_cache = LRUCache(maxsize=memory_size)
+
+def get_extraction_cache():
+    return _extraction_cache
+
+register_cache("extraction", lambda: _extraction_cache.stats())
+
+def _disk_path(key):
+    return os.path.join(EXTRACTION_CACHE_DIR, key[:2], f"{key}.txt")
+
+def _cache_get(key):
+    text = _extraction_cache.get(key)
+    if text is None and EXTRACTION_CACHE_DIR:
+        try:
+            with open(_disk_path(key), encoding="utf-8") as f:
+                text = f.read()
+            _extraction_cache.put(key, text)
+        except OSError:
+            pass
+    return text
+
+def _cache_put(key, text):
+    _extraction_cache.put(key, text)
+    if EXTRACTION_CACHE_DIR:
+        path = _disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Extraction cache write error: {e}")
+
+# =====================================================
+# PDF
+# =====================================================
+
+def _read_bytes(file):
+    if isinstance(file, (bytes, bytearray)):
+        return bytes(file)
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            return f.read()
+    return file.read()
+
+# Each worker parses the PDF once and then serves page ranges from it
+_worker_reader = None
+
+def _init_worker(data):
+    global _worker_reader
+    _worker_reader = PyPDF2.PdfReader(io.BytesIO(data))
+
+def _extract_page_range(start, stop):
+    return [_worker_reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+def iter_pdf_pages(file, max_pages=None, max_words=None, workers=None):
+    """
+    Yield the text of each PDF page, in order ("" for pages without text).
+
+    max_pages stops after that many pages; max_words stops after the page
+    that brings the running word count to max_words. Large PDFs (see
+    PARALLEL_PAGE_THRESHOLD) are extracted by a pool of worker processes in
+    page ranges; pass workers=1 to stay in-process.
+    """
+    data = _read_bytes(file)
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    page_count = len(reader.pages)
+    if max_pages is not None:
+        page_count = min(page_count, max_pages)
+
+    if workers is None:
+        workers = MAX_WORKERS if page_count >= PARALLEL_PAGE_THRESHOLD else 1
+
+    if workers > 1:
+        pages = _iter_pages_parallel(data, page_count, workers)
+    else:
+        pages = (reader.pages[i].extract_text() or "" for i in range(page_count))
+
+    word_count = 0
+    try:
+        for text in pages:
+            yield text
+            if max_words is not None:
+                word_count += len(text.split())
+                if word_count >= max_words:
+                    return
+    finally:
+        pages.close()
+
+# Workers are never forked from this (possibly multithreaded, e.g.
+# Streamlit) process, whose locks a child could inherit mid-use. They fork
+# from a single-threaded forkserver that has this module preloaded, or are
+# spawned where forkserver is unavailable (Windows).
+_pool_context = None
+
+def get_pool_context():
+    global _pool_context
+    if _pool_context is None:
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload([__name__])
+        else:
+            context = multiprocessing.get_context("spawn")
+        _pool_context = context
+    return _pool_context
+
+def _iter_pages_parallel(data, page_count, workers):
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data,),
+                               mp_context=get_pool_context())
+    futures = [
+        pool.submit(_extract_page_range, start, min(start + PAGES_PER_TASK, page_count))
+        for start in range(0, page_count, PAGES_PER_TASK)
+    ]
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        # Early stop: drop page ranges that have not started yet
+        for future in futures:
+            future.cancel()
+        pool.shutdown(wait=False)
+
+def extract_text_from_pdf(file, max_pages=None, max_words=None):
     """Extract text from PDF file"""
     try:
-        pdf_reader = PyPDF2.PdfReader(file)
-        text = ""
-        for page in pdf_reader.pages:
-            extracted = page.extract_text()
-            if extracted:
-                text += extracted + "\n"
-        return text
+        pages = iter_pdf_pages(file, max_pages=max_pages, max_words=max_words)
+        return "".join(text + "\n" for text in pages if text)
     except Exception as e:
         return f"Error extracting PDF: {str(e)}"
 
+# =====================================================
+# DOCX
+# =====================================================
+
+def _docx_text(file):
+    doc = docx.Document(file)
+    return "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
+
 def extract_text_from_docx(file):
     """Extract text from DOCX file"""
     try:
-        doc = docx.Document(file)
-        return "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
+        return _docx_text(file)
     except Exception as e:
-        return f"Error extracting DOCX: {str(e)}"
\ No newline at end of file
+        return f"Error extracting DOCX: {str(e)}"
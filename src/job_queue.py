@@ -0,0 +1,146 @@
+# src/job_queue.py
+"""
+Local background job queue.
+
+Jobs run on a bounded thread pool and are identified by a caller-chosen key
+(e.g. a content hash of the inputs). Submitting a key that is already
+queued, running or recently finished returns the existing job instead of
+starting a duplicate, so identical analyses share one computation. Callers
+poll status(key) and collect result(key) once it is "done".
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import observe
+
+# =====================================================
+# SETTINGS
+# =====================================================
+
+MAX_WORKERS = 2
+
+# Finished jobs are kept this long so every poller can collect them
+RESULT_TTL_SECONDS = 600
+MAX_FINISHED_JOBS = 256
+
+# =====================================================
+# JOBS
+# =====================================================
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+class Job:
+    """One submitted job and its timing"""
+
+    def __init__(self, key):
+        self.key = key
+        self.future = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def status(self):
+        if self.future.done():
+            return FAILED if self.future.exception() is not None else DONE
+        return RUNNING if self.started_at is not None else PENDING
+
+class JobQueue:
+    """Deduplicating background job queue on a thread pool"""
+
+    def __init__(self, max_workers=MAX_WORKERS, result_ttl=RESULT_TTL_SECONDS,
+                 max_finished=MAX_FINISHED_JOBS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="resumealign-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.result_ttl = result_ttl
+        self.max_finished = max_finished
+        self.submitted = 0
+        self.deduplicated = 0
+
+    def submit(self, key, fn, *args, **kwargs):
+        """
+        Queue fn(*args, **kwargs) under key and return the key.
+
+        If a job with this key is pending, running or finished successfully
+        (and not yet expired) it is reused; failed jobs are retried.
+        """
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(key)
+            if job is not None and job.status != FAILED:
+                self.deduplicated += 1
+                return key
+
+            job = Job(key)
+            self._jobs[key] = job
+            self.submitted += 1
+            job.future = self._executor.submit(self._run, job, fn, args, kwargs)
+            return key
+
+    def _run(self, job, fn, args, kwargs):
+        job.started_at = time.time()
+        observe("queue_wait", job.started_at - job.submitted_at)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            job.finished_at = time.time()
+
+    def _prune(self):
+        # Called with the lock held
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.future.done()]
+        expired = {job.key for job in finished
+                   if now - (job.finished_at or now) > self.result_ttl}
+        overflow = len(finished) - len(expired) - self.max_finished
+        if overflow > 0:
+            remaining = sorted((job for job in finished if job.key not in expired),
+                               key=lambda job: job.finished_at or now)
+            expired.update(job.key for job in remaining[:overflow])
+        for key in expired:
+            del self._jobs[key]
+
+    def get(self, key):
+        with self._lock:
+            return self._jobs.get(key)
+
+    def status(self, key):
+        """pending, running, done or failed; None for unknown/expired keys"""
+        job = self.get(key)
+        return job.status if job is not None else None
+
+    def result(self, key, timeout=None):
+        """Wait for a job's result (re-raises the job's exception)"""
+        job = self.get(key)
+        if job is None:
+            raise KeyError(key)
+        return job.future.result(timeout)
+
+    def error(self, key):
+        """The exception a failed job raised, else None"""
+        job = self.get(key)
+        if job is None or job.status != FAILED:
+            return None
+        return job.future.exception()
+
+    def forget(self, key):
+        with self._lock:
+            self._jobs.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        counts["submitted"] = self.submitted
+        counts["deduplicated"] = self.deduplicated
+        return counts
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
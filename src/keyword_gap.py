@@ -1,6 +1,10 @@
 # src/keyword_gap.py
 import re
+import heapq
 from collections import Counter
+from functools import lru_cache
+
+from keyword_idf import get_idf_table
 
 # Common English stopwords (balanced - not too aggressive)
 STOPWORDS = {
@@ -90,15 +94,54 @@ SYNONYMS = {
 
 }
 
-def extract_keywords(text, top_n=40):
-    """Extract clean, meaningful keywords from text"""
+GARBAGE_PHRASES = [
+    'we are', 'we are seeking', 'type full', 'full time', 'part time',
+    'ideal candidate', 'candidate possesses', 'qualified candidate',
+    'successful candidate', 'about us', 'why join', 'reports to',
+    'position summary', 'time position', 'job title', 'department location'
+]
+
+# A single-space garbage phrase "a b" occurs in the 2-word phrase "w1 w2"
+# exactly when w1 ends with "a" and w2 starts with "b"; longer garbage
+# phrases can never occur in a 2-word phrase
+_GARBAGE_PAIRS = [tuple(g.split(' ')) for g in GARBAGE_PHRASES if g.count(' ') == 1]
+
+@lru_cache(maxsize=65536)
+def _word_features(word):
+    """Per-word flags used by extract_keywords, computed once per distinct word"""
+    phrase_ok = word not in STOPWORDS and len(word) >= 2
+    phrase_business = any(term in word for term in BUSINESS_TERMS)
+    
+    if len(word) > 2 and word not in STOPWORDS and not word.isdigit():
+        unigram_weight = 2 if word in BUSINESS_TERMS else 1
+    else:
+        unigram_weight = 0
+    
+    garbage_tail = 0
+    garbage_head = 0
+    for bit, (first, second) in enumerate(_GARBAGE_PAIRS):
+        if word.endswith(first):
+            garbage_tail |= 1 << bit
+        if word.startswith(second):
+            garbage_head |= 1 << bit
+    
+    return phrase_ok, phrase_business, unigram_weight, garbage_tail, garbage_head
+
+def keyword_candidates(text, already_clean=False):
+    """
+    Candidate keywords of a text and their raw weights.
+    
+    Returns (candidates, weights): 2-word phrases then single words, in
+    first-seen order. Both lists are empty for texts under 3 words.
+    already_clean=True marks text as clean_text() output.
+    """
     if not text:
-        return set()
+        return [], []
     
     # Clean text
     try:
         from text_cleaner import clean_text_for_keywords
-        text = clean_text_for_keywords(text)
+        text = clean_text_for_keywords(text, already_clean=already_clean)
     except:
         text = text.lower()
         text = re.sub(r'[^\w\s]', ' ', text)
@@ -107,107 +150,182 @@ def extract_keywords(text, top_n=40):
     words = text.split()
     
     if len(words) < 3:
-        return set()
+        return [], []
+    
+    # Integer ids per distinct word, in first-seen order
+    vocab = {}
+    ids = [vocab.setdefault(word, len(vocab)) for word in words]
+    vocab_words = list(vocab)
+    features = [_word_features(word) for word in vocab_words]
     
-    keywords = {}
+    # Candidates in the same first-seen order as the original loops
+    # (phrases, then single words) so ties break the same way
+    candidates = []
+    scores = []
     
     # Extract 2-word phrases (INCREASED WEIGHT)
-    for i in range(len(words) - 1):
-        word1, word2 = words[i], words[i+1]
+    for (a, b), count in Counter(zip(ids, ids[1:])).items():
+        ok_a, business_a, _, tail_a, _ = features[a]
+        ok_b, business_b, _, _, head_b = features[b]
         
-        # Skip only essential stopwords
-        if word1 in STOPWORDS or word2 in STOPWORDS:
-            continue
-        
-        if len(word1) < 2 or len(word2) < 2:  # Allow 2-letter words (like "roi", "seo")
-            continue
-        
-        phrase = f"{word1} {word2}"
-        
-        # Skip obvious garbage
-        if is_garbage_phrase(phrase):
+        # Skip stopwords, 1-letter words and obvious garbage
+        if not (ok_a and ok_b) or tail_a & head_b:
             continue
         
         # Give higher weight to business terms
-        if any(term in phrase.lower() for term in BUSINESS_TERMS):
-            keywords[phrase] = keywords.get(phrase, 0) + 3
-        else:
-            keywords[phrase] = keywords.get(phrase, 0) + 2
+        candidates.append(f"{vocab_words[a]} {vocab_words[b]}")
+        scores.append(count * (3 if business_a or business_b else 2))
     
     # Extract important single words
-    for word in words:
-        if (len(word) > 2 and  # Allow 3+ letter words
-            word not in STOPWORDS and 
-            not word.isdigit()):
-            
-            if word in BUSINESS_TERMS:
-                keywords[word] = keywords.get(word, 0) + 2
-            else:
-                keywords[word] = keywords.get(word, 0) + 1
-    
-    # Sort and return top N (INCREASED from 30 to 40)
-    sorted_keywords = sorted(keywords.items(), key=lambda x: x[1], reverse=True)
-    result = {kw for kw, score in sorted_keywords[:top_n]}
-    
-    return result
+    for a, count in Counter(ids).items():
+        weight = features[a][2]
+        if weight:
+            candidates.append(vocab_words[a])
+            scores.append(count * weight)
+    
+    return candidates, scores
+
+def extract_keywords(text, top_n=40, already_clean=False):
+    """Extract clean, meaningful keywords from text (already_clean: text is clean_text() output)"""
+    candidates, scores = keyword_candidates(text, already_clean=already_clean)
+    
+    if not candidates:
+        return set()
+    
+    # TF-IDF weighting when a fitted table is available (see keyword_idf)
+    idf = get_idf_table()
+    if idf is not None:
+        scores = [score * idf.idf(term) for term, score in zip(candidates, scores)]
+    
+    # Top N by score, earliest candidate first on ties
+    order = range(len(candidates))
+    if 0 <= top_n < len(candidates):
+        top = heapq.nsmallest(top_n, order, key=lambda k: (-scores[k], k))
+    else:
+        top = sorted(order, key=lambda k: -scores[k])[:top_n]
+    
+    return {candidates[k] for k in top}
 
 def is_garbage_phrase(phrase):
     """Check if a phrase is definitely garbage (minimal filtering)"""
-    garbage_phrases = [
-        'we are', 'we are seeking', 'type full', 'full time', 'part time',
-        'ideal candidate', 'candidate possesses', 'qualified candidate',
-        'successful candidate', 'about us', 'why join', 'reports to',
-        'position summary', 'time position', 'job title', 'department location'
-    ]
-    
     phrase_lower = phrase.lower()
-    for garbage in garbage_phrases:
+    for garbage in GARBAGE_PHRASES:
         if garbage in phrase_lower:
             return True
     
     # Don't filter by length or other metrics - keep more keywords
     return False
 
-def match_keywords_with_context(resume_keywords, jd_keywords, resume_text, jd_text):
+# =====================================================
+# RESUME KEYWORD INDEX
+# =====================================================
+
+# JD keywords shorter than this are skipped and every synonym is at least
+# this long, so shorter substrings never need indexing
+MIN_INDEXED_SUBSTRING = 3
+
+class KeywordIndex:
+    """
+    Lookup tables over one resume's keywords for match_keywords_with_context.
+    
+    Keywords keep their iteration order ("position"), and every lookup
+    returns the earliest position, so results are the same as the original
+    linear scans over resume_keywords.
+    """
+    
+    def __init__(self, resume_keywords, resume_text):
+        self.keywords = list(resume_keywords)
+        lowered = [kw.lower() for kw in self.keywords]
+        
+        self.exact = set(lowered)
+        self.position = {}    # keyword -> first position
+        self.containing = {}  # substring -> first position of a keyword containing it
+        self.token = {}       # word -> first position of a keyword containing it
+        
+        for pos, kw in enumerate(lowered):
+            self.position.setdefault(kw, pos)
+            for word in kw.split():
+                self.token.setdefault(word, pos)
+            for i in range(len(kw)):
+                for j in range(i + MIN_INDEXED_SUBSTRING, len(kw) + 1):
+                    self.containing.setdefault(kw[i:j], pos)
+        
+        self.lengths = sorted({len(kw) for kw in lowered})
+        self.text = resume_text.lower()
+        self._in_text = {}
+    
+    def _first_containing(self, term):
+        if len(term) >= MIN_INDEXED_SUBSTRING:
+            return self.containing.get(term)
+        for pos, kw in enumerate(self.keywords):
+            if term in kw.lower():
+                return pos
+        return None
+    
+    def substring_match(self, term):
+        """First keyword that contains term or is contained in it"""
+        best = self._first_containing(term)
+        
+        # Keywords inside term: probe term's substrings of each keyword length
+        for length in self.lengths:
+            if length > len(term):
+                break
+            for i in range(len(term) - length + 1):
+                pos = self.position.get(term[i:i + length])
+                if pos is not None and (best is None or pos < best):
+                    best = pos
+        
+        return None if best is None else self.keywords[best]
+    
+    def word_match(self, term):
+        """First keyword sharing at least one word with term"""
+        positions = [self.token[w] for w in set(term.split()) if w in self.token]
+        return self.keywords[min(positions)] if positions else None
+    
+    def appears(self, term):
+        """True if term occurs in the resume text or inside any keyword"""
+        if term not in self._in_text:
+            self._in_text[term] = (term in self.text or
+                                   self._first_containing(term) is not None)
+        return self._in_text[term]
+
+def build_keyword_index(resume_keywords, resume_text):
+    return KeywordIndex(resume_keywords, resume_text)
+
+def match_keywords_with_context(resume_keywords, jd_keywords, resume_text, jd_text, index=None):
     """Match JD keywords against resume keywords (lenient for higher match rate)"""
     matched = []
     missing = []
     partial_matches = {}
     semantic_matches = {}
     
-    resume_text_lower = resume_text.lower()
-    resume_keywords_lower = {kw.lower() for kw in resume_keywords}
+    if index is None:
+        index = build_keyword_index(resume_keywords, resume_text)
     
     for jd_kw in jd_keywords:
         jd_kw_lower = jd_kw.lower()
         
         # Skip obvious garbage only
-        if len(jd_kw) < 3 or jd_kw.lower() in ['candidate', 'ideal', 'title']:
+        if len(jd_kw) < 3 or jd_kw_lower in ['candidate', 'ideal', 'title']:
             continue
         
         # Check 1: Exact match
-        if jd_kw_lower in resume_keywords_lower:
+        if jd_kw_lower in index.exact:
             matched.append(jd_kw)
             continue
         
         # Check 2: Substring match (lenient)
-        found = False
-        for rk in resume_keywords:
-            rk_lower = rk.lower()
-            if (jd_kw_lower in rk_lower or rk_lower in jd_kw_lower):
-                matched.append(jd_kw)
-                partial_matches[jd_kw] = rk
-                found = True
-                break
-        
-        if found:
+        rk = index.substring_match(jd_kw_lower)
+        if rk is not None:
+            matched.append(jd_kw)
+            partial_matches[jd_kw] = rk
             continue
         
         # Check 3: Synonym matching
         found_synonym = False
         if jd_kw_lower in SYNONYMS:
             for synonym in SYNONYMS[jd_kw_lower]:
-                if synonym in resume_text_lower or any(synonym in rk.lower() for rk in resume_keywords):
+                if index.appears(synonym):
                     matched.append(jd_kw)
                     semantic_matches[jd_kw] = f"synonym: {synonym}"
                     found_synonym = True
@@ -217,20 +335,14 @@ def match_keywords_with_context(resume_keywords, jd_keywords, resume_text, jd_te
             continue
         
         # Check 4: Word overlap (lenient - any word match)
-        jd_words = set(jd_kw_lower.split())
-        for rk in resume_keywords:
-            rk_words = set(rk.lower().split())
-            if len(jd_words & rk_words) >= 1:
-                matched.append(jd_kw)
-                partial_matches[jd_kw] = f"{rk} (word match)"
-                found = True
-                break
-        
-        if found:
+        rk = index.word_match(jd_kw_lower)
+        if rk is not None:
+            matched.append(jd_kw)
+            partial_matches[jd_kw] = f"{rk} (word match)"
             continue
         
         # Check 5: Check if ANY part appears in resume text
-        if jd_kw_lower in resume_text_lower:
+        if jd_kw_lower in index.text:
             matched.append(jd_kw)
             partial_matches[jd_kw] = "found in resume text"
             continue
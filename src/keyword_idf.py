@@ -0,0 +1,202 @@
+# src/keyword_idf.py
+"""
+Corpus document-frequency statistics for keyword weighting.
+
+fit_idf() counts, over a corpus of JDs/resumes, how many documents contain
+each candidate keyword (the same phrases and words extract_keywords
+produces) and writes a compact open-addressing hash table of
+(term fingerprint -> idf). At runtime the table is memory-mapped and each
+lookup is a hash plus a short probe.
+"""
+
+import os
+import math
+import mmap
+import struct
+import hashlib
+import threading
+from array import array
+
+# =====================================================
+# SETTINGS
+# =====================================================
+
+DEFAULT_IDF_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "data", "keyword_idf.bin"
+)
+IDF_FILE = os.environ.get("RESUMEALIGN_IDF_FILE", DEFAULT_IDF_FILE)
+
+IDF_MAGIC = b"KIDF"
+IDF_VERSION = 1
+
+# magic, version, documents, terms, slots, idf for unseen terms
+_HEADER = struct.Struct("<4sIQQQd")
+
+# =====================================================
+# HASHING
+# =====================================================
+
+def term_fingerprint(term):
+    """Stable 64-bit fingerprint of a term (0 is reserved for empty slots)"""
+    value = int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+    return value or 1
+
+def smooth_idf(document_count, document_frequency):
+    return math.log((1 + document_count) / (1 + document_frequency)) + 1
+
+# =====================================================
+# TABLE
+# =====================================================
+
+class IdfTable:
+    """Read-only, memory-mapped term -> idf table written by write_idf_table()"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, documents, terms, slots, default = _HEADER.unpack_from(self._mmap, 0)
+        if magic != IDF_MAGIC or version != IDF_VERSION:
+            self._mmap.close()
+            raise ValueError(f"Not an IDF table (or wrong version): {path}")
+
+        view = memoryview(self._mmap)
+        pos = _HEADER.size
+        self._keys = view[pos:pos + slots * 8].cast("Q")
+        pos += slots * 8
+        self._values = view[pos:pos + slots * 4].cast("f")
+
+        # Identifies the table's contents, e.g. for cache keys of results
+        # that were weighted with it
+        self.fingerprint = hashlib.blake2b(self._mmap, digest_size=16).hexdigest()
+        self.path = path
+        self.documents = documents
+        self.terms = terms
+        self.default = default
+        self._mask = slots - 1
+
+    def idf(self, term):
+        """idf of term; unseen terms get the maximum (df = 0) value"""
+        key = term_fingerprint(term)
+        slot = key & self._mask
+        while True:
+            stored = self._keys[slot]
+            if stored == key:
+                return self._values[slot]
+            if stored == 0:
+                return self.default
+            slot = (slot + 1) & self._mask
+
+def write_idf_table(document_frequencies, document_count, path):
+    """Write {term: document frequency} as an IDF table file (atomically)"""
+    slots = 1
+    while slots < 2 * max(len(document_frequencies), 1):
+        slots <<= 1
+
+    keys = array("Q", bytes(8 * slots))
+    values = array("f", bytes(4 * slots))
+    mask = slots - 1
+
+    for term, frequency in document_frequencies.items():
+        key = term_fingerprint(term)
+        slot = key & mask
+        while keys[slot] not in (0, key):
+            slot = (slot + 1) & mask
+        keys[slot] = key
+        values[slot] = smooth_idf(document_count, frequency)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(IDF_MAGIC, IDF_VERSION, document_count,
+                             len(document_frequencies), slots,
+                             smooth_idf(document_count, 0)))
+        f.write(keys.tobytes())
+        f.write(values.tobytes())
+    os.replace(tmp_path, path)
+
+# =====================================================
+# FIT
+# =====================================================
+
+def fit_idf(documents, path=IDF_FILE, min_df=2):
+    """
+    Build document frequencies over an iterable of texts and write the table.
+
+    Terms seen in fewer than min_df documents are left out to keep the file
+    small; at lookup time they get the unseen-term idf.
+    """
+    from keyword_gap import keyword_candidates
+
+    frequencies = {}
+    count = 0
+    for text in documents:
+        count += 1
+        for term in set(keyword_candidates(text)[0]):
+            frequencies[term] = frequencies.get(term, 0) + 1
+
+    kept = {term: df for term, df in frequencies.items() if df >= min_df}
+    write_idf_table(kept, count, path)
+    return {"documents": count, "terms": len(kept), "path": path}
+
+# =====================================================
+# PROCESS-WIDE TABLE
+# =====================================================
+
+_table = None
+_table_loaded = False
+_table_lock = threading.Lock()
+
+def get_idf_table():
+    """The table at IDF_FILE, or None when no table has been fitted"""
+    global _table, _table_loaded
+    if not _table_loaded:
+        with _table_lock:
+            if not _table_loaded:
+                if os.path.exists(IDF_FILE):
+                    try:
+                        _table = IdfTable(IDF_FILE)
+                    except (OSError, ValueError) as e:
+                        print(f"IDF table not loaded: {e}")
+                _table_loaded = True
+    return _table
+
+def set_idf_table(table):
+    """Use a specific IdfTable (or None for raw counts) in this process"""
+    global _table, _table_loaded
+    with _table_lock:
+        _table = table
+        _table_loaded = True
+
+def idf_fingerprint():
+    """Fingerprint of the table in use ("" for raw counts)"""
+    table = get_idf_table()
+    return table.fingerprint if table is not None else ""
+
+# =====================================================
+# COMMAND LINE
+# =====================================================
+
+def _iter_corpus(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.lower().endswith(".txt"):
+                        with open(os.path.join(root, name), encoding="utf-8", errors="ignore") as f:
+                            yield f.read()
+        else:
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                yield f.read()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fit keyword IDF statistics over a text corpus")
+    parser.add_argument("corpus", nargs="+", help=".txt files or directories of .txt files")
+    parser.add_argument("-o", "--output", default=IDF_FILE, help="table file to write")
+    parser.add_argument("--min-df", type=int, default=2, help="drop terms seen in fewer documents")
+    args = parser.parse_args()
+
+    summary = fit_idf(_iter_corpus(args.corpus), args.output, min_df=args.min_df)
+    print(f"Fitted {summary['terms']} terms over {summary['documents']} documents -> {summary['path']}")
@@ -1,23 +1,93 @@
 # src/matcher.py
+import os
 import re
-import streamlit as st
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
+import copy
+import json
+import threading
 
 # Local module imports
-from text_cleaner import clean_text
+from cache_utils import TTLCache, content_hash
+from text_cleaner import clean_text, boilerplate_fingerprint
 from skill_gap import extract_skills
 from keyword_gap import extract_keywords, match_keywords_with_context, extract_phrases_from_text
+from keyword_idf import idf_fingerprint
+from model_backends import load_model, model_id
+from metrics import timed, register_cache
+
+# numpy, sentence_transformers (and with it torch) and the embedding cache
+# are imported on first use, so regex-only callers never load them
 
 # =====================================================
 # LOAD SEMANTIC MODEL
 # =====================================================
 
-@st.cache_resource
-def get_model():
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+# A model cache backend is any callable backend(name, loader) that returns
+# the cached model for name, calling loader() to create it when missing.
+# The default keeps one instance per process; the Streamlit app plugs in
+# st.cache_resource instead.
+_models = {}
+_models_lock = threading.Lock()
+
+def process_model_cache(name, loader):
+    """Default backend: one model instance per name for this process"""
+    with _models_lock:
+        if name not in _models:
+            _models[name] = loader()
+        return _models[name]
+
+_model_cache = process_model_cache
+
+def set_model_cache(backend):
+    """Use backend(name, loader) to cache models (None restores the default)"""
+    global _model_cache
+    _model_cache = backend or process_model_cache
+
+def _load_model(backend):
+    with timed("model_load"):
+        return load_model(MODEL_NAME, backend)
+
+def get_model(backend=None):
     """Loads and caches the model so it only downloads once."""
-    return SentenceTransformer("all-MiniLM-L6-v2")
+    return _model_cache(model_id(MODEL_NAME, backend), lambda: _load_model(backend))
+
+# =====================================================
+# EMBEDDING CACHE
+# =====================================================
+
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+
+def get_embedding_cache():
+    """Return the process-wide embedding cache, creating it on first use"""
+    global _embedding_cache
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                from embedding_cache import EmbeddingCache
+                _embedding_cache = EmbeddingCache()
+                register_cache("embeddings", _embedding_cache.memory.stats)
+    return _embedding_cache
+
+def encode_texts(texts):
+    """Encode texts, skipping the model for any text already in the cache"""
+    import numpy as np
+
+    # Backends give slightly different vectors, so each has its own entries
+    cache = get_embedding_cache()
+    model_key = model_id(MODEL_NAME)
+    vectors = cache.get_many(texts, model_key)
+
+    # Encode each distinct uncached text once, in a single batch
+    missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+    if missing:
+        encoded = get_model().encode(missing, convert_to_numpy=True)
+        cache.put_many(missing, encoded, model_key)
+        lookup = dict(zip(missing, encoded))
+        vectors = [lookup[t] if v is None else v for t, v in zip(texts, vectors)]
+
+    return np.vstack(vectors)
 
 # =====================================================
 # EXPERIENCE EXTRACTION
@@ -57,23 +127,109 @@ def extract_experience_years(text):
 # SEMANTIC SIMILARITY
 # =====================================================
 
-def calculate_similarity(resume_text, jd_text):
+MAX_SIMILARITY_WORDS = 512
+
+# "truncate" embeds the first MAX_SIMILARITY_WORDS words of each document.
+# "mean", "max" and "best_pair" embed overlapping windows over the whole
+# document and pool them (see pool_window_similarity).
+SIMILARITY_MODES = ("truncate", "mean", "max", "best_pair")
+SIMILARITY_MODE = os.environ.get("RESUMEALIGN_SIMILARITY_MODE", "truncate")
+
+# A typo in the environment should not silently select a pooling mode
+if SIMILARITY_MODE not in SIMILARITY_MODES:
+    print(f"Unknown RESUMEALIGN_SIMILARITY_MODE {SIMILARITY_MODE!r}, "
+          f"expected one of {SIMILARITY_MODES}; using 'truncate'")
+    SIMILARITY_MODE = "truncate"
+
+# ~160 words stays under MiniLM's 256 word-piece limit for typical English
+WINDOW_WORDS = 160
+WINDOW_STRIDE = 120
+MAX_WINDOWS = 12
+
+def truncate_words(text, max_length=MAX_SIMILARITY_WORDS):
+    """Cut text to its first max_length whitespace-separated words"""
+    words = text.split()
+    if len(words) > max_length:
+        return ' '.join(words[:max_length])
+    return text
+
+def split_windows(text, window=WINDOW_WORDS, stride=WINDOW_STRIDE, max_windows=MAX_WINDOWS):
+    """
+    Split text into overlapping word windows.
+    
+    When a document needs more than max_windows windows, exactly max_windows
+    are spread evenly from start to end, so long CVs are still covered end to
+    end at a bounded encoding cost.
+    """
+    words = text.split()
+    if len(words) <= window:
+        return [' '.join(words)]
+    
+    last = len(words) - window
+    starts = list(range(0, last + 1, stride))
+    if starts[-1] != last:
+        starts.append(last)
+    
+    if len(starts) > max_windows:
+        starts = [round(i * last / (max_windows - 1)) for i in range(max_windows)]
+    
+    return [' '.join(words[s:s + window]) for s in starts]
+
+def check_similarity_mode(mode):
+    """Return mode (SIMILARITY_MODE when None), raising ValueError for unknown modes"""
+    mode = mode or SIMILARITY_MODE
+    if mode not in SIMILARITY_MODES:
+        raise ValueError(f"Unknown similarity mode {mode!r}, expected one of {SIMILARITY_MODES}")
+    return mode
+
+def _normalize_rows(matrix):
+    import numpy as np
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+def pool_window_similarity(resume_windows, jd_windows, mode):
+    """Pool window embeddings (one row per window) into a single score"""
+    import numpy as np
+
+    resume_unit = _normalize_rows(resume_windows)
+    jd_unit = _normalize_rows(jd_windows)
+    
+    if mode == "best_pair":
+        # Best-matching resume window against best-matching JD window
+        return float((resume_unit @ jd_unit.T).max())
+    
+    if mode == "max":
+        resume_vector = resume_unit.max(axis=0)
+        jd_vector = jd_unit.max(axis=0)
+    else:
+        resume_vector = resume_unit.mean(axis=0)
+        jd_vector = jd_unit.mean(axis=0)
+    
+    denominator = np.linalg.norm(resume_vector) * np.linalg.norm(jd_vector)
+    return float(resume_vector @ jd_vector / denominator) if denominator else 0.0
+
+def calculate_similarity(resume_text, jd_text, mode=None):
     """Calculate semantic similarity between resume and job description"""
+    mode = check_similarity_mode(mode)
     try:
-        model = get_model()
+        if mode != "truncate":
+            resume_windows = split_windows(resume_text)
+            jd_windows = split_windows(jd_text)
+            
+            # All windows of both documents go through one encode call
+            matrix = encode_texts(resume_windows + jd_windows)
+            return pool_window_similarity(
+                matrix[:len(resume_windows)], matrix[len(resume_windows):], mode
+            )
         
         # Handle long texts by truncating
-        max_length = 512
-        resume_words = resume_text.split()
-        jd_words = jd_text.split()
+        resume_text = truncate_words(resume_text)
+        jd_text = truncate_words(jd_text)
         
-        if len(resume_words) > max_length:
-            resume_text = ' '.join(resume_words[:max_length])
-        if len(jd_words) > max_length:
-            jd_text = ' '.join(jd_words[:max_length])
+        resume_embedding, jd_embedding = encode_texts([resume_text, jd_text])
         
-        resume_embedding = model.encode(resume_text)
-        jd_embedding = model.encode(jd_text)
+        from sklearn.metrics.pairwise import cosine_similarity
         
         similarity = cosine_similarity(
             [resume_embedding],
@@ -82,10 +238,54 @@ def calculate_similarity(resume_text, jd_text):
         
         return float(similarity)
     
+    except ImportError:
+        # A missing model dependency (e.g. the onnx extra) is a setup error,
+        # not a similarity of 0.0
+        raise
     except Exception as e:
         print(f"Similarity Calculation Error: {e}")
         return 0.0
 
+def calculate_similarities(resume_texts, jd_text, batch_size=64, mode=None):
+    """Cosine similarity of many resumes against one JD as a matrix product"""
+    import numpy as np
+
+    mode = check_similarity_mode(mode)
+    try:
+        if mode != "truncate":
+            jd_matrix = encode_texts(split_windows(jd_text))
+            
+            scores = []
+            for start in range(0, len(resume_texts), batch_size):
+                windows = [split_windows(t) for t in resume_texts[start:start + batch_size]]
+                matrix = encode_texts([w for doc in windows for w in doc])
+                offset = 0
+                for doc in windows:
+                    rows = matrix[offset:offset + len(doc)]
+                    scores.append(pool_window_similarity(rows, jd_matrix, mode))
+                    offset += len(doc)
+            
+            return scores
+        
+        jd_vector = encode_texts([truncate_words(jd_text)])[0]
+        jd_vector = jd_vector / (np.linalg.norm(jd_vector) or 1.0)
+        
+        scores = []
+        for start in range(0, len(resume_texts), batch_size):
+            batch = [truncate_words(t) for t in resume_texts[start:start + batch_size]]
+            matrix = encode_texts(batch)
+            norms = np.linalg.norm(matrix, axis=1)
+            norms[norms == 0] = 1.0
+            scores.extend((matrix @ jd_vector) / norms)
+        
+        return [float(score) for score in scores]
+    
+    except ImportError:
+        raise
+    except Exception as e:
+        print(f"Similarity Calculation Error: {e}")
+        return [0.0] * len(resume_texts)
+
 # =====================================================
 # EXPERIENCE SCORE
 # =====================================================
@@ -131,43 +331,68 @@ def calculate_skill_score(resume_skills, jd_skills):
     return score, matched, missing, partial_matches
 
 # =====================================================
-# MAIN MATCH FUNCTION
+# WEIGHTS
 # =====================================================
 
-def calculate_detailed_match(resume_text, jd_text):
-    """Calculate detailed match between resume and job description"""
-    
-    resume_clean = clean_text(resume_text)
+WEIGHTS = {
+    "skills": 0.40,
+    "experience": 0.15,
+    "keywords": 0.15,
+    "similarity": 0.30
+}
+
+# =====================================================
+# JD / RESUME PREPARATION
+# =====================================================
+
+def prepare_jd(jd_text):
+    """Run the JD-side extraction once so it can be reused across resumes"""
     jd_clean = clean_text(jd_text)
+    jd_skills = extract_skills(jd_clean)
+    jd_keywords = extract_keywords(jd_clean, top_n=40, already_clean=True)
+    
+    return {
+        "text": jd_text,
+        "clean": jd_clean,
+        "skills": jd_skills,
+        # Remove skill overlap to avoid double-counting
+        "keywords": jd_keywords - {s.lower() for s in jd_skills},
+        "years": extract_experience_years(jd_text)
+    }
+
+def score_resume(resume_text, resume_clean, jd, similarity_score):
+    """Score one cleaned resume against a prepared JD"""
     
     # =================================================
     # SKILLS
     # =================================================
-    resume_skills = extract_skills(resume_clean)
-    jd_skills = extract_skills(jd_clean)
-    
-    skill_score, matched_skills, missing_skills, skill_partial_matches = calculate_skill_score(
-        resume_skills, jd_skills
-    )
+    with timed("skills"):
+        resume_skills = extract_skills(resume_clean)
+        jd_skills = jd["skills"]
+        
+        skill_score, matched_skills, missing_skills, skill_partial_matches = calculate_skill_score(
+            resume_skills, jd_skills
+        )
     
     # =================================================
     # KEYWORDS (IMPROVED WITH PHRASES)
     # =================================================
     # Extract keywords including phrases
-    resume_keywords = extract_keywords(resume_clean, top_n=40)
-    jd_keywords = extract_keywords(jd_clean, top_n=40)
-    
-    # Remove skill overlap to avoid double-counting
-    resume_keywords = resume_keywords - {s.lower() for s in resume_skills}
-    jd_keywords = jd_keywords - {s.lower() for s in jd_skills}
+    with timed("keywords"):
+        resume_keywords = extract_keywords(resume_clean, top_n=40, already_clean=True)
+        jd_keywords = jd["keywords"]
+        
+        # Remove skill overlap to avoid double-counting
+        resume_keywords = resume_keywords - {s.lower() for s in resume_skills}
     
     # Calculate keyword score with enhanced matching
-    keyword_match = match_keywords_with_context(
-        resume_keywords, 
-        jd_keywords, 
-        resume_clean, 
-        jd_clean
-    )
+    with timed("keyword_matching"):
+        keyword_match = match_keywords_with_context(
+            resume_keywords, 
+            jd_keywords, 
+            resume_clean, 
+            jd["clean"]
+        )
     
     keyword_score = keyword_match['match_percentage'] / 100
     matched_keywords = keyword_match['matched']
@@ -176,31 +401,20 @@ def calculate_detailed_match(resume_text, jd_text):
     # =================================================
     # EXPERIENCE
     # =================================================
-    resume_years = extract_experience_years(resume_text)
-    jd_years = extract_experience_years(jd_text)
+    with timed("experience"):
+        resume_years = extract_experience_years(resume_text)
+    jd_years = jd["years"]
     
     experience_score = calculate_experience_score(resume_years, jd_years)
     
     # =================================================
-    # SIMILARITY
-    # =================================================
-    similarity_score = calculate_similarity(resume_clean, jd_clean)
-    
-    # =================================================
-    # WEIGHTS
+    # FINAL SCORE
     # =================================================
-    weights = {
-        "skills": 0.40,
-        "experience": 0.15,
-        "keywords": 0.15,
-        "similarity": 0.30
-    }
-    
     final_score = (
-        skill_score * weights["skills"] +
-        experience_score * weights["experience"] +
-        keyword_score * weights["keywords"] +
-        similarity_score * weights["similarity"]
+        skill_score * WEIGHTS["skills"] +
+        experience_score * WEIGHTS["experience"] +
+        keyword_score * WEIGHTS["keywords"] +
+        similarity_score * WEIGHTS["similarity"]
     ) * 100
     
     final_score = round(min(final_score, 100), 2)
@@ -233,6 +447,91 @@ def calculate_detailed_match(resume_text, jd_text):
         }
     }
 
+# =====================================================
+# MAIN MATCH FUNCTION
+# =====================================================
+
+# Bump when a scoring change should invalidate cached results
+SCORING_VERSION = "1"
+
+RESULT_CACHE_SIZE = 256
+RESULT_CACHE_TTL = 3600
+
+_result_cache = TTLCache(maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL)
+
+register_cache("match_results", _result_cache.stats)
+
+def scoring_config():
+    """Everything besides the two texts that changes a match result"""
+    return content_hash(SCORING_VERSION, json.dumps(WEIGHTS, sort_keys=True),
+                        SIMILARITY_MODE, model_id(MODEL_NAME),
+                        idf_fingerprint(), boilerplate_fingerprint())
+
+def result_key(resume_text, jd_text):
+    """Cache key for a match: (hash(resume), hash(jd), scoring config)"""
+    return content_hash(content_hash(resume_text), content_hash(jd_text), scoring_config())
+
+def get_result_cache():
+    return _result_cache
+
+def calculate_detailed_match(resume_text, jd_text):
+    """Calculate detailed match between resume and job description"""
+    with timed("match"):
+        return _calculate_detailed_match(resume_text, jd_text)
+
+def _calculate_detailed_match(resume_text, jd_text):
+    key = result_key(resume_text, jd_text)
+    cached = _result_cache.get(key)
+    if cached is not None:
+        # Callers may modify the result, so never hand out the cached dict
+        return copy.deepcopy(cached)
+    
+    with timed("prepare_jd"):
+        jd = prepare_jd(jd_text)
+    with timed("clean_text"):
+        resume_clean = clean_text(resume_text)
+    with timed("similarity"):
+        similarity_score = calculate_similarity(resume_clean, jd["clean"])
+    
+    result = score_resume(resume_text, resume_clean, jd, similarity_score)
+    
+    # A failed similarity call also scores 0.0; don't keep that for an hour
+    if similarity_score:
+        _result_cache.put(key, copy.deepcopy(result))
+    return result
+
+# =====================================================
+# BATCH RANKING
+# =====================================================
+
+def rank_resumes(jd_text, resumes, batch_size=64):
+    """
+    Rank many resumes against one job description.
+    
+    resumes may be a list of texts or a dict of {resume_id: text}. The JD is
+    cleaned, skill-extracted and encoded once; resumes are encoded in batches
+    and scored with one matrix product per batch. Returns match dicts (with an
+    added "id") sorted by overall score, best first.
+    """
+    if isinstance(resumes, dict):
+        ids, texts = list(resumes.keys()), list(resumes.values())
+    else:
+        texts = list(resumes)
+        ids = list(range(len(texts)))
+    
+    jd = prepare_jd(jd_text)
+    cleaned = [clean_text(text) for text in texts]
+    similarities = calculate_similarities(cleaned, jd["clean"], batch_size=batch_size)
+    
+    results = []
+    for resume_id, text, resume_clean, similarity_score in zip(ids, texts, cleaned, similarities):
+        result = score_resume(text, resume_clean, jd, similarity_score)
+        result["id"] = resume_id
+        results.append(result)
+    
+    results.sort(key=lambda r: r["overall"], reverse=True)
+    return results
+
 # =====================================================
 # INTERPRETATION
 # =====================================================
@@ -0,0 +1,288 @@
+# src/metrics.py
+"""
+Per-stage latency metrics, cache hit ratios and model-load time.
+
+Stages are timed with
+
+    with timed("similarity"):
+        ...
+
+which is a shared no-op unless metrics are enabled (RESUMEALIGN_METRICS=1
+or enable()), so the instrumentation costs one function call when off.
+Each stage keeps a count, a running total and its most recent
+MAX_SAMPLES durations, from which p50/p95/p99 are computed at export time.
+Caches add themselves with register_cache(name, cache.stats).
+
+Export either way (or both), started by start_exporters():
+  RESUMEALIGN_METRICS_PORT  serve Prometheus text on http://127.0.0.1:<port>/metrics
+  RESUMEALIGN_METRICS_LOG   append a JSON snapshot to this file every
+                            METRICS_LOG_INTERVAL seconds
+"""
+
+import os
+import json
+import time
+import threading
+from collections import deque
+
+# =====================================================
+# SETTINGS
+# =====================================================
+
+METRICS_ENABLED = os.environ.get("RESUMEALIGN_METRICS", "").lower() in ("1", "true", "yes", "on")
+METRICS_PORT = int(os.environ.get("RESUMEALIGN_METRICS_PORT", "0") or 0)
+METRICS_HOST = os.environ.get("RESUMEALIGN_METRICS_HOST", "127.0.0.1")
+METRICS_LOG = os.environ.get("RESUMEALIGN_METRICS_LOG")
+METRICS_LOG_INTERVAL = 60
+
+# Percentiles are computed over this many most recent samples per stage
+MAX_SAMPLES = 1024
+QUANTILES = (0.5, 0.95, 0.99)
+
+PREFIX = "resumealign"
+
+# =====================================================
+# REGISTRY
+# =====================================================
+
+class StageStats:
+    """Counters and a window of recent durations for one stage"""
+
+    def __init__(self, max_samples=MAX_SAMPLES):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.samples = deque(maxlen=max_samples)
+
+    def observe(self, seconds, error=False):
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if error:
+            self.errors += 1
+        self.samples.append(seconds)
+
+    def quantiles(self):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {q: 0.0 for q in QUANTILES}
+        return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in QUANTILES}
+
+_enabled = METRICS_ENABLED
+_stages = {}
+_caches = {}
+_lock = threading.Lock()
+
+def enable(flag=True):
+    """Turn recording on or off at runtime"""
+    global _enabled
+    _enabled = flag
+
+def is_enabled():
+    return _enabled
+
+def observe(stage, seconds, error=False):
+    """Record one duration for stage"""
+    if not _enabled:
+        return
+    with _lock:
+        stats = _stages.get(stage)
+        if stats is None:
+            stats = _stages[stage] = StageStats()
+        stats.observe(seconds, error)
+
+def register_cache(name, stats_fn):
+    """Report a cache's hit ratio; stats_fn() returns a dict like LRUCache.stats()"""
+    _caches[name] = stats_fn
+
+def reset():
+    with _lock:
+        _stages.clear()
+
+# =====================================================
+# TIMING
+# =====================================================
+
+class _Timer:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.stage, time.perf_counter() - self.start, error=exc_type is not None)
+        return False
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+def timed(stage):
+    """Context manager timing its block as stage (a no-op while disabled)"""
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(stage)
+
+# =====================================================
+# SNAPSHOT / EXPORT
+# =====================================================
+
+def snapshot():
+    """All stage timings (seconds) and cache statistics as a plain dict"""
+    with _lock:
+        stages = {
+            name: {"count": s.count, "errors": s.errors, "sum": s.total, "last": s.last,
+                   **{f"p{int(q * 100)}": v for q, v in s.quantiles().items()}}
+            for name, s in _stages.items()
+        }
+
+    caches = {}
+    for name, stats_fn in list(_caches.items()):
+        try:
+            caches[name] = stats_fn()
+        except Exception as e:
+            print(f"Metrics cache stats error ({name}): {e}")
+
+    return {"timestamp": time.time(), "stages": stages, "caches": caches}
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def render_prometheus(data=None):
+    """Prometheus text exposition format of snapshot()"""
+    data = data or snapshot()
+    lines = [
+        f"# HELP {PREFIX}_stage_seconds Stage latency (quantiles over the last {MAX_SAMPLES} runs)",
+        f"# TYPE {PREFIX}_stage_seconds summary",
+    ]
+    for name, s in sorted(data["stages"].items()):
+        stage = _label(name)
+        for q in QUANTILES:
+            lines.append(f'{PREFIX}_stage_seconds{{stage="{stage}",quantile="{q}"}} '
+                         f'{s[f"p{int(q * 100)}"]:.9g}')
+        lines.append(f'{PREFIX}_stage_seconds_sum{{stage="{stage}"}} {s["sum"]:.9g}')
+        lines.append(f'{PREFIX}_stage_seconds_count{{stage="{stage}"}} {s["count"]}')
+
+    lines += [f"# HELP {PREFIX}_stage_errors_total Stage runs that raised",
+              f"# TYPE {PREFIX}_stage_errors_total counter"]
+    for name, s in sorted(data["stages"].items()):
+        lines.append(f'{PREFIX}_stage_errors_total{{stage="{_label(name)}"}} {s["errors"]}')
+
+    model_load = data["stages"].get("model_load")
+    if model_load:
+        lines += [f"# HELP {PREFIX}_model_load_seconds Duration of the latest model load",
+                  f"# TYPE {PREFIX}_model_load_seconds gauge",
+                  f"{PREFIX}_model_load_seconds {model_load['last']:.9g}"]
+
+    for metric, key, kind in (("cache_hits_total", "hits", "counter"),
+                              ("cache_misses_total", "misses", "counter"),
+                              ("cache_hit_ratio", "hit_ratio", "gauge"),
+                              ("cache_entries", "size", "gauge")):
+        lines += [f"# TYPE {PREFIX}_{metric} {kind}"]
+        for name, stats in sorted(data["caches"].items()):
+            if key in stats:
+                lines.append(f'{PREFIX}_{metric}{{cache="{_label(name)}"}} {stats[key]}')
+
+    return "\n".join(lines) + "\n"
+
+def write_log(path=None, data=None):
+    """Append one JSON snapshot line to path (METRICS_LOG by default)"""
+    path = path or METRICS_LOG
+    line = json.dumps(data or snapshot(), default=str)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+# =====================================================
+# EXPORTERS
+# =====================================================
+
+_exporters_started = False
+
+def start_http_server(port=None, host=None):
+    """Serve /metrics in Prometheus text format from a daemon thread"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host or METRICS_HOST, port or METRICS_PORT), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+def start_log_writer(path=None, interval=METRICS_LOG_INTERVAL):
+    """Append a snapshot to the log file every interval seconds from a daemon thread"""
+    path = path or METRICS_LOG
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                write_log(path)
+            except OSError as e:
+                print(f"Metrics log error: {e}")
+
+    thread = threading.Thread(target=run, name="metrics-log", daemon=True)
+    thread.start()
+    return thread
+
+def start_exporters():
+    """Start the exporters configured by environment variables (once per process)"""
+    global _exporters_started
+    if not _enabled:
+        return
+    with _lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+
+    if METRICS_PORT:
+        try:
+            start_http_server()
+        except OSError as e:
+            print(f"Metrics endpoint disabled: {e}")
+    if METRICS_LOG:
+        start_log_writer()
+
+# =====================================================
+# COMMAND LINE
+# =====================================================
+
+if __name__ == "__main__":
+    # Disabled-path overhead of a timed() block
+    import timeit
+
+    def block():
+        with timed("noop"):
+            pass
+
+    enable(False)
+    off = min(timeit.repeat(block, number=100000, repeat=5)) / 100000
+    enable(True)
+    on = min(timeit.repeat(block, number=100000, repeat=5)) / 100000
+    print(f"timed() overhead: disabled {off * 1e9:.0f} ns, enabled {on * 1e9:.0f} ns")
+    print(render_prometheus(), end="")
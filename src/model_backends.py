@@ -0,0 +1,202 @@
+# src/model_backends.py
+"""
+Inference backends for the sentence-embedding model.
+
+  torch       - stock fp32 PyTorch model (the reference)
+  torch-int8  - PyTorch with dynamic int8 quantization of the Linear layers
+  onnx        - fp32 ONNX Runtime export
+  onnx-int8   - dynamically quantized (int8) ONNX Runtime export
+
+ONNX exports are written once under ONNX_MODEL_DIR and loaded from there
+afterwards (the onnx backends need `pip install sentence-transformers[onnx]`).
+Quantized backends produce slightly different vectors, so check_parity()
+compares their cosine scores with the torch backend's.
+
+    python src/model_backends.py torch-int8 onnx-int8
+
+reports load time, encode latency, peak RSS and score drift per backend.
+"""
+
+import os
+
+from cache_utils import CACHE_DIR
+
+# =====================================================
+# SETTINGS
+# =====================================================
+
+INFERENCE_BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+INFERENCE_BACKEND = os.environ.get("RESUMEALIGN_INFERENCE_BACKEND", "torch")
+
+# A typo here would otherwise only fail inside the similarity step
+if INFERENCE_BACKEND not in INFERENCE_BACKENDS:
+    print(f"Unknown RESUMEALIGN_INFERENCE_BACKEND {INFERENCE_BACKEND!r}, "
+          f"expected one of {INFERENCE_BACKENDS}; using 'torch'")
+    INFERENCE_BACKEND = "torch"
+
+ONNX_MODEL_DIR = os.path.join(CACHE_DIR, "onnx_models")
+
+# Quantization target for onnx-int8; "avx2" runs on any recent x86 CPU,
+# "avx512_vnni" is faster where supported, "arm64" for ARM nodes
+ONNX_QUANTIZATION = os.environ.get("RESUMEALIGN_ONNX_QUANTIZATION", "avx2")
+
+# Largest cosine score difference from torch that check_parity() accepts
+PARITY_TOLERANCE = 0.02
+
+# =====================================================
+# LOADING
+# =====================================================
+
+def check_backend(backend):
+    """Return backend (INFERENCE_BACKEND when None), raising ValueError for unknown backends"""
+    backend = backend or INFERENCE_BACKEND
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"Unknown inference backend {backend!r}, expected one of {INFERENCE_BACKENDS}")
+    return backend
+
+def model_id(name, backend=None):
+    """Identifier for cached embeddings (torch keeps the bare model name)"""
+    backend = check_backend(backend)
+    return name if backend == "torch" else f"{name}@{backend}"
+
+def export_dir(name):
+    return os.path.join(ONNX_MODEL_DIR, name.replace("/", "__"))
+
+def _quantized_file():
+    return os.path.join("onnx", f"model_qint8_{ONNX_QUANTIZATION}.onnx")
+
+def load_model(name, backend=None):
+    """Load a SentenceTransformer for the given backend (no caching)"""
+    backend = check_backend(backend)
+
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(name)
+
+    if backend == "torch-int8":
+        import torch
+        model = SentenceTransformer(name, device="cpu")
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    target = export_dir(name)
+    if not os.path.exists(os.path.join(target, "onnx", "model.onnx")):
+        # First use: export from the hub model and keep it for next time
+        SentenceTransformer(name, backend="onnx").save(target)
+
+    if backend == "onnx":
+        return SentenceTransformer(target, backend="onnx")
+
+    quantized = _quantized_file()
+    if not os.path.exists(os.path.join(target, quantized)):
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+        export_dynamic_quantized_onnx_model(
+            SentenceTransformer(target, backend="onnx"), ONNX_QUANTIZATION, target
+        )
+
+    return SentenceTransformer(target, backend="onnx", model_kwargs={"file_name": quantized})
+
+# =====================================================
+# PARITY CHECK
+# =====================================================
+
+SAMPLE_PAIRS = [
+    ("Data analyst with 4 years of SQL, Python and Tableau dashboards for sales reporting.",
+     "We are hiring a data analyst skilled in SQL, Python and Power BI to build KPI reports."),
+    ("Frontend engineer building React and TypeScript apps, REST APIs and CI pipelines.",
+     "Backend developer needed: Java, Spring Boot, microservices on AWS and Kubernetes."),
+    ("Digital marketing specialist running SEO, Google Ads and email campaigns.",
+     "Marketing manager to own paid search, SEO strategy and campaign budgets."),
+    ("Machine learning engineer training PyTorch models and deploying them with Docker.",
+     "Seeking an ML engineer with deep learning, MLOps and cloud deployment experience."),
+    ("Project manager leading agile teams, stakeholder communication and budgets.",
+     "Registered nurse for a busy emergency department, night shifts required."),
+]
+
+def pair_scores(model, pairs=SAMPLE_PAIRS):
+    """Cosine similarity of each (resume, jd) pair under one model"""
+    import numpy as np
+
+    texts = [text for pair in pairs for text in pair]
+    vectors = np.asarray(model.encode(texts, convert_to_numpy=True), dtype=np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    return [float(vectors[2 * i] @ vectors[2 * i + 1]) for i in range(len(pairs))]
+
+def check_parity(name, backend, tolerance=PARITY_TOLERANCE, pairs=SAMPLE_PAIRS):
+    """
+    Compare a backend's cosine scores with the torch backend's.
+
+    Returns {"backend", "max_diff", "ok"}; ok is False when any pair differs
+    by more than tolerance.
+    """
+    reference = pair_scores(load_model(name, "torch"), pairs)
+    scores = pair_scores(load_model(name, backend), pairs)
+    max_diff = max(abs(a - b) for a, b in zip(reference, scores))
+    return {"backend": backend, "max_diff": max_diff, "ok": max_diff <= tolerance}
+
+# =====================================================
+# COMMAND LINE
+# =====================================================
+
+def _measure(name, backend, repeats):
+    """Load time, encode latency, peak RSS and sample scores in this process"""
+    import sys
+    import time
+    import resource
+
+    start = time.perf_counter()
+    model = load_model(name, backend)
+    load_seconds = time.perf_counter() - start
+
+    texts = [text for pair in SAMPLE_PAIRS for text in pair]
+    model.encode(texts)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        model.encode(texts)
+    latency_ms = (time.perf_counter() - start) / repeats * 1000
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = rss / (1 << 20) if sys.platform == "darwin" else rss / 1024
+
+    return {"backend": backend, "load_s": load_seconds, "encode_ms": latency_ms,
+            "peak_rss_mb": rss_mb, "scores": pair_scores(model)}
+
+if __name__ == "__main__":
+    import sys
+    import json
+    import argparse
+    import subprocess
+
+    parser = argparse.ArgumentParser(description="Compare embedding inference backends")
+    parser.add_argument("backends", nargs="*", default=list(INFERENCE_BACKENDS))
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--tolerance", type=float, default=PARITY_TOLERANCE)
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(_measure(args.model, args.measure, args.repeats)))
+        sys.exit(0)
+
+    # One process per backend so peak RSS is not shared between them
+    results = {}
+    for backend in ["torch"] + [b for b in args.backends if b != "torch"]:
+        output = subprocess.run(
+            [sys.executable, __file__, "--measure", backend,
+             "--model", args.model, "--repeats", str(args.repeats)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        results[backend] = json.loads(output.strip().splitlines()[-1])
+
+    reference = results["torch"]["scores"]
+    failed = False
+    print(f"{'backend':<12}{'load s':>8}{'encode ms':>11}{'peak MB':>9}{'max diff':>10}")
+    for backend, result in results.items():
+        diff = max(abs(a - b) for a, b in zip(reference, result["scores"]))
+        failed = failed or diff > args.tolerance
+        print(f"{backend:<12}{result['load_s']:>8.2f}{result['encode_ms']:>11.1f}"
+              f"{result['peak_rss_mb']:>9.0f}{diff:>10.4f}")
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,319 @@
+# src/persistence.py
+"""
+SQLite persistence for users and analysis history.
+
+Connections come from a small per-process pool instead of being opened per
+call. Every connection runs in WAL mode (readers no longer block on the
+writer) with the pragmas below, and statements are module constants so
+sqlite3's per-connection statement cache reuses the compiled form. Writes
+from threads of this process take a lock first, so concurrent saves queue
+in order instead of spinning in SQLite's busy handler.
+"""
+
+import os
+import json
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+# =====================================================
+# SETTINGS
+# =====================================================
+
+DB_FILE = os.environ.get("RESUMEALIGN_DB_FILE", os.path.join("database", "resumealign.db"))
+
+POOL_SIZE = 8
+POOL_TIMEOUT_SECONDS = 10
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",    # safe with WAL, no fsync per commit
+    "PRAGMA busy_timeout=5000",     # other processes: wait instead of failing
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",      # ~8 MB page cache per connection
+)
+
+# =====================================================
+# STATEMENTS
+# =====================================================
+
+CREATE_USERS_SQL = '''CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    password TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)'''
+
+CREATE_HISTORY_SQL = '''CREATE TABLE IF NOT EXISTS analysis_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_email TEXT NOT NULL,
+    analysis_id TEXT NOT NULL,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    match_score REAL,
+    job_title TEXT,
+    company_name TEXT,
+    report_path TEXT,
+    html_report_path TEXT,
+    resume_snippet TEXT,
+    jd_snippet TEXT,
+    matched_skills TEXT,
+    missing_skills TEXT,
+    matched_keywords TEXT,
+    missing_keywords TEXT,
+    semantic_matches TEXT,
+    FOREIGN KEY (user_email) REFERENCES users(email))'''
+
+INSERT_ANALYSIS_SQL = '''INSERT INTO analysis_history
+    (user_email, analysis_id, timestamp, match_score, job_title, company_name,
+     report_path, html_report_path, resume_snippet, jd_snippet,
+     matched_skills, missing_skills, matched_keywords, missing_keywords, semantic_matches)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'''
+
+# Newest first; keyset pagination continues after the (timestamp, id) of
+# the last row of the previous page. The JSON columns are left out here and
+# fetched per analysis by SELECT_DETAILS_SQL.
+SELECT_HISTORY_SQL = '''SELECT id, analysis_id, timestamp, match_score, job_title, company_name,
+    report_path, html_report_path
+    FROM analysis_history WHERE user_email = ?
+    ORDER BY timestamp DESC, id DESC LIMIT ?'''
+
+SELECT_HISTORY_PAGE_SQL = '''SELECT id, analysis_id, timestamp, match_score, job_title, company_name,
+    report_path, html_report_path
+    FROM analysis_history WHERE user_email = ? AND (timestamp, id) < (?, ?)
+    ORDER BY timestamp DESC, id DESC LIMIT ?'''
+
+SELECT_DETAILS_SQL = '''SELECT matched_skills, missing_skills, matched_keywords,
+    missing_keywords, semantic_matches
+    FROM analysis_history WHERE user_email = ? AND analysis_id = ?
+    ORDER BY id DESC LIMIT 1'''
+
+HISTORY_PAGE_SIZE = 20
+
+# =====================================================
+# MIGRATIONS
+# =====================================================
+
+# Applied in order; PRAGMA user_version records how many have run
+MIGRATIONS = [
+    # 1: history is always read per user, newest first (SQLite walks the
+    # index backwards, and the implicit rowid breaks timestamp ties)
+    ['''CREATE INDEX IF NOT EXISTS idx_history_user_time
+        ON analysis_history (user_email, timestamp)'''],
+]
+
+# =====================================================
+# CONNECTION POOL
+# =====================================================
+
+class ConnectionPool:
+    """Fixed-size pool of configured SQLite connections to one database file"""
+
+    def __init__(self, path=DB_FILE, size=POOL_SIZE, timeout=POOL_TIMEOUT_SECONDS):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self.write_lock = threading.Lock()
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=64)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._created -= 1
+                    raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No free database connection after {self.timeout}s")
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; uncommitted work is rolled back on return"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Borrow a connection for a write, committed if the block succeeds"""
+        with self.write_lock, self.connection() as conn:
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def close(self):
+        with self._lock:
+            while True:
+                try:
+                    self._idle.get_nowait().close()
+                except queue.Empty:
+                    break
+            self._created = 0
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(path=None):
+    """The process-wide pool for path (DB_FILE by default), schema ensured"""
+    path = path or DB_FILE
+    pool = _pools.get(path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(path)
+            if pool is None:
+                pool = ConnectionPool(path)
+                init_db(pool)
+                _pools[path] = pool
+    return pool
+
+# =====================================================
+# SCHEMA
+# =====================================================
+
+def init_db(pool=None):
+    """Create the tables and apply pending migrations (once per process via get_pool)"""
+    pool = pool or get_pool()
+    with pool.transaction() as conn:
+        # IMMEDIATE takes the write lock up front, so only one process migrates
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(CREATE_USERS_SQL)
+        conn.execute(CREATE_HISTORY_SQL)
+
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {number}")
+
+# =====================================================
+# ANALYSIS HISTORY
+# =====================================================
+
+def save_analysis_to_db(user_email, analysis_id, match_score, job_title, company_name,
+                        report_path, html_report_path, resume_snippet, jd_snippet,
+                        matched_skills, missing_skills, matched_keywords, missing_keywords,
+                        semantic_matches):
+    try:
+        # Serialize before taking the write lock to keep the critical section short
+        row = (user_email, analysis_id, datetime.now(), match_score, job_title, company_name,
+               str(report_path), str(html_report_path), resume_snippet[:200], jd_snippet[:200],
+               json.dumps(list(matched_skills)), json.dumps(list(missing_skills)),
+               json.dumps(list(matched_keywords)), json.dumps(list(missing_keywords)),
+               json.dumps(semantic_matches))
+        with get_pool().transaction() as conn:
+            conn.execute(INSERT_ANALYSIS_SQL, row)
+        return True
+    except Exception as e:
+        print(f"Database save error: {e}")
+        return False
+
+def load_analysis_history(user_email, limit=HISTORY_PAGE_SIZE, before=None):
+    """
+    One page of a user's history, newest first, without the JSON columns.
+
+    Rows are (id, analysis_id, timestamp, match_score, job_title,
+    company_name, report_path, html_report_path). Pass the last row's
+    (timestamp, id) as before to get the next page.
+    """
+    try:
+        with get_pool().connection() as conn:
+            if before is None:
+                return conn.execute(SELECT_HISTORY_SQL, (user_email, limit)).fetchall()
+            timestamp, row_id = before
+            return conn.execute(SELECT_HISTORY_PAGE_SQL,
+                                (user_email, timestamp, row_id, limit)).fetchall()
+    except Exception as e:
+        print(f"Load history error: {e}")
+        return []
+
+def load_analysis_details(user_email, analysis_id):
+    """The skill/keyword lists and semantic matches of one saved analysis"""
+    try:
+        with get_pool().connection() as conn:
+            row = conn.execute(SELECT_DETAILS_SQL, (user_email, analysis_id)).fetchone()
+    except Exception as e:
+        print(f"Load details error: {e}")
+        return None
+    if row is None:
+        return None
+
+    names = ("matched_skills", "missing_skills", "matched_keywords",
+             "missing_keywords", "semantic_matches")
+    details = {}
+    for name, value in zip(names, row):
+        try:
+            details[name] = json.loads(value) if value else None
+        except ValueError:
+            details[name] = None
+    details["semantic_matches"] = details["semantic_matches"] or {}
+    for name in names[:4]:
+        details[name] = details[name] or []
+    return details
+
+# =====================================================
+# COMMAND LINE
+# =====================================================
+
+if __name__ == "__main__":
+    import time
+    import argparse
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    parser = argparse.ArgumentParser(description="Concurrent insert latency benchmark")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--inserts", type=int, default=200, help="inserts per thread")
+    args = parser.parse_args()
+
+    DB_FILE = os.path.join(tempfile.mkdtemp(), "bench.db")
+    skills = ["python", "sql", "tableau", "excel"]
+
+    def worker(n):
+        latencies = []
+        for i in range(args.inserts):
+            start = time.perf_counter()
+            save_analysis_to_db(f"user{n}@example.com", f"analysis_{n}_{i}", 72.5, "Data Analyst", "",
+                                "report.txt", "report.html", "resume " * 50, "jd " * 50,
+                                skills, skills, skills, skills, {"sql": {"similarity": 0.9}})
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    with ThreadPoolExecutor(args.threads) as executor:
+        latencies = sorted(l for part in executor.map(worker, range(args.threads)) for l in part)
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000
+
+    print(f"{len(latencies)} inserts from {args.threads} threads: "
+          f"p50 {pct(50):.2f}ms  p95 {pct(95):.2f}ms  p99 {pct(99):.2f}ms  max {latencies[-1] * 1000:.2f}ms")
@@ -0,0 +1,330 @@
+# src/phrase_automaton.py
+"""
+Aho-Corasick multi-phrase matcher.
+
+Finds every occurrence of every phrase in a single left-to-right pass over
+the text, so scan time depends on the text length rather than on how many
+phrases are loaded.
+"""
+
+import os
+import mmap
+import struct
+from array import array
+from bisect import bisect_left
+from collections import deque
+
+# =====================================================
+# WORD BOUNDARIES
+# =====================================================
+
+def is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+def at_word_boundary(text, pos):
+    """Same test as regex \\b: word-ness differs on each side of pos"""
+    before = pos > 0 and is_word_char(text[pos - 1])
+    after = pos < len(text) and is_word_char(text[pos])
+    return before != after
+
+# =====================================================
+# INDEX FILE FORMAT
+# =====================================================
+
+INDEX_MAGIC = b"PHRA"
+INDEX_VERSION = 1
+
+# magic, version, word_boundary, states, transitions, outputs, phrases,
+# phrase blob bytes, label blob bytes
+_HEADER = struct.Struct("<4sIIIIIIQQ")
+
+class _StringTable:
+    """Read-only string sequence decoded on demand from a UTF-8 blob"""
+
+    def __init__(self, blob, offsets):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return str(self._blob[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+def _pack_strings(strings):
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = array("i", [0])
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    return b"".join(encoded), offsets
+
+# =====================================================
+# AUTOMATON
+# =====================================================
+
+class PhraseAutomaton:
+    """
+    Multi-phrase matcher over a fixed phrase list.
+
+    Transitions are stored in flat CSR arrays (per-state offsets into sorted
+    character/target arrays) rather than per-state dicts. With
+    word_boundary=True a match only counts where regex \\b would hold at both
+    ends of the phrase. Matching is case-sensitive; callers lowercase both
+    the phrases and the text.
+
+    Each phrase may carry a string label (e.g. a skill category). A built
+    automaton can be saved to an index file and loaded back with load(),
+    which memory-maps the tables instead of rebuilding them.
+    """
+
+    def __init__(self, phrases, word_boundary=True, labels=None):
+        if labels is None:
+            labels = [""] * len(phrases)
+
+        # First occurrence of a phrase wins
+        unique = {}
+        for phrase, label in zip(phrases, labels):
+            if phrase and phrase not in unique:
+                unique[phrase] = label
+
+        self.phrases = list(unique)
+        self.labels = list(unique.values())
+        self.word_boundary = word_boundary
+        self._mmap = None
+        self._build()
+
+    # -------------------------------------------------
+    # Construction
+    # -------------------------------------------------
+
+    def _build(self):
+        goto = [{}]
+        outputs = [[]]
+
+        # Trie of all phrases
+        for index, phrase in enumerate(self.phrases):
+            state = 0
+            for ch in phrase:
+                code = ord(ch)
+                nxt = goto[state].get(code)
+                if nxt is None:
+                    goto.append({})
+                    outputs.append([])
+                    nxt = len(goto) - 1
+                    goto[state][code] = nxt
+                state = nxt
+            outputs[state].append(index)
+
+        # Failure links, breadth-first so shallower states are done first
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for code, target in goto[state].items():
+                queue.append(target)
+                link = fail[state]
+                while link and code not in goto[link]:
+                    link = fail[link]
+                fail[target] = goto[link].get(code, 0)
+                outputs[target].extend(outputs[fail[target]])
+
+        # Flatten into CSR arrays
+        trans_offsets = array("i", [0])
+        trans_chars = array("I")
+        trans_targets = array("i")
+        out_offsets = array("i", [0])
+        out_ids = array("i")
+        for state in range(len(goto)):
+            for code in sorted(goto[state]):
+                trans_chars.append(code)
+                trans_targets.append(goto[state][code])
+            trans_offsets.append(len(trans_chars))
+            out_ids.extend(outputs[state])
+            out_offsets.append(len(out_ids))
+
+        self._trans_offsets = trans_offsets
+        self._trans_chars = trans_chars
+        self._trans_targets = trans_targets
+        self._fail = array("i", fail)
+        self._out_offsets = out_offsets
+        self._out_ids = out_ids
+        self._lengths = array("i", (len(p) for p in self.phrases))
+        self._root = dict(goto[0])
+
+    # -------------------------------------------------
+    # Persistence
+    # -------------------------------------------------
+
+    def save(self, path):
+        """Write the automaton to an index file (atomically)"""
+        phrase_blob, phrase_offsets = _pack_strings(self.phrases)
+        label_blob, label_offsets = _pack_strings(self.labels)
+        tables = [
+            self._trans_offsets, self._trans_chars, self._trans_targets,
+            self._fail, self._out_offsets, self._out_ids, self._lengths,
+            phrase_offsets, label_offsets
+        ]
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(
+                INDEX_MAGIC, INDEX_VERSION, int(self.word_boundary),
+                len(self._fail), len(self._trans_chars), len(self._out_ids),
+                len(self.phrases), len(phrase_blob), len(label_blob)
+            ))
+            for table in tables:
+                f.write(table.tobytes())
+            f.write(phrase_blob)
+            f.write(label_blob)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map an index file written by save()"""
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, word_boundary, n_states, n_trans, n_out,
+         n_phrases, phrase_bytes, label_bytes) = _HEADER.unpack_from(mapped, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            mapped.close()
+            raise ValueError(f"Not a phrase index (or wrong version): {path}")
+
+        view = memoryview(mapped)
+        pos = _HEADER.size
+
+        def take(count, fmt):
+            nonlocal pos
+            size = count * 4
+            table = view[pos:pos + size].cast(fmt)
+            pos += size
+            return table
+
+        self = cls.__new__(cls)
+        self.word_boundary = bool(word_boundary)
+        self._trans_offsets = take(n_states + 1, "i")
+        self._trans_chars = take(n_trans, "I")
+        self._trans_targets = take(n_trans, "i")
+        self._fail = take(n_states, "i")
+        self._out_offsets = take(n_states + 1, "i")
+        self._out_ids = take(n_out, "i")
+        self._lengths = take(n_phrases, "i")
+        phrase_offsets = take(n_phrases + 1, "i")
+        label_offsets = take(n_phrases + 1, "i")
+        self.phrases = _StringTable(view[pos:pos + phrase_bytes], phrase_offsets)
+        pos += phrase_bytes
+        self.labels = _StringTable(view[pos:pos + label_bytes], label_offsets)
+        self._mmap = mapped
+
+        # Root transitions are the hot path, keep them in a dict
+        lo, hi = self._trans_offsets[0], self._trans_offsets[1]
+        self._root = {self._trans_chars[k]: self._trans_targets[k] for k in range(lo, hi)}
+        return self
+
+    # -------------------------------------------------
+    # Lookup
+    # -------------------------------------------------
+
+    def _step(self, state, code):
+        lo, hi = self._trans_offsets[state], self._trans_offsets[state + 1]
+        k = bisect_left(self._trans_chars, code, lo, hi)
+        if k < hi and self._trans_chars[k] == code:
+            return self._trans_targets[k]
+        return -1
+
+    def lookup(self, phrase):
+        """Return the index of an exact phrase, or -1 if it is not loaded"""
+        state = 0
+        for ch in phrase:
+            state = self._step(state, ord(ch))
+            if state < 0:
+                return -1
+
+        for k in range(self._out_offsets[state], self._out_offsets[state + 1]):
+            index = self._out_ids[k]
+            if self._lengths[index] == len(phrase):
+                return index
+        return -1
+
+    # -------------------------------------------------
+    # Matching
+    # -------------------------------------------------
+
+    def iter_matches(self, text):
+        """Yield (start, end, phrase_index) for every match, overlaps included"""
+        offsets = self._trans_offsets
+        chars = self._trans_chars
+        targets = self._trans_targets
+        fail = self._fail
+        out_offsets = self._out_offsets
+        out_ids = self._out_ids
+        lengths = self._lengths
+        root = self._root
+        check_boundary = self.word_boundary
+
+        state = 0
+        for i, ch in enumerate(text):
+            code = ord(ch)
+            while True:
+                if state == 0:
+                    state = root.get(code, 0)
+                    break
+                lo, hi = offsets[state], offsets[state + 1]
+                k = bisect_left(chars, code, lo, hi)
+                if k < hi and chars[k] == code:
+                    state = targets[k]
+                    break
+                state = fail[state]
+
+            if state == 0:
+                continue
+
+            end = i + 1
+            for k in range(out_offsets[state], out_offsets[state + 1]):
+                index = out_ids[k]
+                start = end - lengths[index]
+                if check_boundary and not (at_word_boundary(text, start) and
+                                           at_word_boundary(text, end)):
+                    continue
+                yield start, end, index
+
+    def find_all(self, text):
+        """Return the set of phrases that occur in text"""
+        return {self.phrases[index] for _, _, index in self.iter_matches(text)}
+
+    def longest_matches(self, text):
+        """Leftmost-longest non-overlapping matches as (start, end, index)"""
+        selected = []
+        pos = 0
+        for start, end, index in sorted(self.iter_matches(text),
+                                        key=lambda m: (m[0], -m[1])):
+            if start >= pos:
+                selected.append((start, end, index))
+                pos = end
+        return selected
+
+    def substitute(self, text):
+        """Replace leftmost-longest matches with their labels in one pass"""
+        parts = []
+        pos = 0
+        for start, end, index in self.longest_matches(text):
+            parts.append(text[pos:start])
+            parts.append(self.labels[index])
+            pos = end
+
+        if not parts:
+            return text
+
+        parts.append(text[pos:])
+        return "".join(parts)
+
+    def __len__(self):
+        return len(self.phrases)
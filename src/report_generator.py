@@ -1,6 +1,83 @@
 # report_generator.py
 import os
+import html
+import json
+import threading
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from templates import Template
+from cache_utils import content_hash
+from report_store import get_report_store
+
+# =====================================================
+# TEXT REPORT TEMPLATES
+# =====================================================
+
+# Parsed once at import; rendering joins pre-split pieces
+RULE = "=" * 70
+THIN_RULE = "-" * 40
+
+TEXT_HEADER = Template(
+    RULE + "\n"
+    "RESUME - JOB DESCRIPTION MATCH ANALYSIS REPORT\n" +
+    RULE + "\n\n"
+    "Generated: {{ generated }}\n"
+    "Resume: {{ resume_filename }}\n"
+    "Job Description: {{ jd_filename }}\n" +
+    "-" * 70 + "\n\n"
+    "📊 OVERALL ASSESSMENT\n" +
+    THIN_RULE + "\n"
+    "Match Score: {{ overall }}%\n\n"
+    "Rating: {{ rating }}\n"
+    "Interpretation: {{ interpretation }}\n\n"
+    "📈 SCORE BREAKDOWN\n" +
+    THIN_RULE + "\n"
+)
+
+TEXT_SKILLS_HEADER = "🔧 SKILLS ANALYSIS\n" + THIN_RULE + "\n"
+TEXT_KEYWORDS_HEADER = "\n🔑 KEYWORDS ANALYSIS\n" + THIN_RULE + "\n"
+
+TEXT_IMPROVEMENTS_HEADER = (
+    "\n" + RULE + "\n"
+    "🚀 ACTIONABLE IMPROVEMENTS\n" +
+    RULE + "\n\n"
+    "IMMEDIATE ACTIONS (Do today):\n" +
+    "-" * 30 + "\n"
+)
+
+TEXT_STATIC_ADVICE = (
+    "\n3. QUANTIFY ACHIEVEMENTS:\n"
+    "   • Add numbers and percentages to your accomplishments\n"
+    "   • Example: 'Improved efficiency by 25%' instead of 'Improved efficiency'\n"
+    "\n\nWEEKLY GOALS (Complete this week):\n" +
+    "-" * 30 + "\n"
+    "1. Update your LinkedIn profile with the same keywords\n"
+    "2. Practice explaining how your skills match the job requirements\n"
+    "3. Network with 2-3 people in similar roles\n"
+    "\n" + RULE + "\n"
+    "🤖 ATS (APPLICANT TRACKING SYSTEM) TIPS\n" +
+    RULE + "\n\n"
+    "✅ DO:\n"
+    "   • Use standard section headers (Experience, Education, Skills)\n"
+    "   • Include keywords from the job description\n"
+    "   • Use a clean, simple format\n"
+    "   • Save as PDF for consistency\n\n"
+    "❌ AVOID:\n"
+    "   • Graphics, images, or logos\n"
+    "   • Tables or text boxes\n"
+    "   • Uncommon fonts\n"
+    "   • Headers/footers that might get cut off\n"
+    "\n" + RULE + "\n"
+    "💡 QUICK TIPS\n" +
+    RULE + "\n\n"
+)
+
+TEXT_FOOTER = "\n" + RULE + "\nGenerated by Resume-JD Matcher\n" + RULE + "\n"
+
+# =====================================================
+# TEXT REPORT
+# =====================================================
 
 def save_match_report(match_result, missing_skills, missing_keywords,
                      resume_filename, jd_filename, output_dir="../reports"):
@@ -19,146 +96,89 @@ def save_match_report(match_result, missing_skills, missing_keywords,
     # Create reports directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
-    # Generate timestamp for unique filename
+    report = render_match_report(match_result, missing_skills, missing_keywords,
+                                 resume_filename, jd_filename)
+    
+    # Timestamp plus content digest: reports from the same second no longer collide
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_file = os.path.join(output_dir, f"match_report_{timestamp}.txt")
+    output_file = os.path.join(output_dir, f"match_report_{timestamp}_{content_hash(report)[:8]}.txt")
     
     with open(output_file, 'w', encoding='utf-8') as f:
-        f.write("=" * 70 + "\n")
-        f.write("RESUME - JOB DESCRIPTION MATCH ANALYSIS REPORT\n")
-        f.write("=" * 70 + "\n\n")
-        
-        # Report metadata
-        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"Resume: {resume_filename}\n")
-        f.write(f"Job Description: {jd_filename}\n")
-        f.write("-" * 70 + "\n\n")
-        
-        # Overall Score
-        f.write("📊 OVERALL ASSESSMENT\n")
-        f.write("-" * 40 + "\n")
-        f.write(f"Match Score: {match_result['overall']}%\n\n")
-        
-        # Score Interpretation
-        score = match_result['overall']
-        if score >= 80:
-            rating = "EXCELLENT"
-            interpretation = "Your resume is very well aligned with this position. Consider applying!"
-        elif score >= 60:
-            rating = "GOOD" 
-            interpretation = "Your resume has a solid foundation. Minor improvements recommended."
-        elif score >= 40:
-            rating = "MODERATE"
-            interpretation = "Significant improvements needed for this role."
-        else:
-            rating = "LOW"
-            interpretation = "This may not be the best fit with your current resume."
-        
-        f.write(f"Rating: {rating}\n")
-        f.write(f"Interpretation: {interpretation}\n\n")
-        
-        # Score Breakdown
-        f.write("📈 SCORE BREAKDOWN\n")
-        f.write("-" * 40 + "\n")
-        for category, score in match_result['breakdown'].items():
-            bar = "█" * int(score / 5) + "░" * (20 - int(score / 5))
-            f.write(f"{category.capitalize():15} {score:6.1f}% |{bar}|\n")
-        f.write("\n")
-        
-        # Skills Analysis
-        f.write("🔧 SKILLS ANALYSIS\n")
-        f.write("-" * 40 + "\n")
-        
-        # Get skills counts
-        if 'skills' in match_result['breakdown']:
-            skill_score = match_result['breakdown']['skills']
-            f.write(f"Skills Match: {skill_score:.1f}%\n")
-        
-        if missing_skills:
-            f.write(f"\nMissing Skills ({len(missing_skills)}):\n")
-            for i, skill in enumerate(sorted(missing_skills), 1):
-                f.write(f"  {i}. {skill}\n")
-        else:
-            f.write("\n✅ All required skills are covered!\n")
-        
-        # Keywords Analysis  
-        f.write("\n🔑 KEYWORDS ANALYSIS\n")
-        f.write("-" * 40 + "\n")
-        
-        if 'keywords' in match_result['breakdown']:
-            keyword_score = match_result['breakdown']['keywords']
-            f.write(f"Keywords Match: {keyword_score:.1f}%\n")
-        
-        if missing_keywords:
-            f.write(f"\nMissing Keywords ({len(missing_keywords)}):\n")
-            # Group keywords for better readability
-            keywords_list = sorted(missing_keywords)
-            for i in range(0, len(keywords_list), 5):
-                chunk = keywords_list[i:i+5]
-                f.write("  • " + ", ".join(chunk) + "\n")
-        else:
-            f.write("\n✅ Excellent keyword coverage!\n")
-        
-        # Improvement Recommendations
-        f.write("\n" + "=" * 70 + "\n")
-        f.write("🚀 ACTIONABLE IMPROVEMENTS\n")
-        f.write("=" * 70 + "\n\n")
-        
-        f.write("IMMEDIATE ACTIONS (Do today):\n")
-        f.write("-" * 30 + "\n")
-        
-        if missing_skills:
-            f.write("1. ADD THESE SKILLS TO YOUR RESUME:\n")
-            for skill in sorted(missing_skills)[:3]:  # Top 3
-                f.write(f"   • Add '{skill}' to your Skills section\n")
-        
-        if missing_keywords:
-            f.write("\n2. INCORPORATE THESE KEYWORDS:\n")
-            for keyword in sorted(missing_keywords)[:5]:  # Top 5
-                f.write(f"   • Use '{keyword}' in your experience bullets\n")
-        
-        f.write("\n3. QUANTIFY ACHIEVEMENTS:\n")
-        f.write("   • Add numbers and percentages to your accomplishments\n")
-        f.write("   • Example: 'Improved efficiency by 25%' instead of 'Improved efficiency'\n")
-        
-        f.write("\n\nWEEKLY GOALS (Complete this week):\n")
-        f.write("-" * 30 + "\n")
-        f.write("1. Update your LinkedIn profile with the same keywords\n")
-        f.write("2. Practice explaining how your skills match the job requirements\n")
-        f.write("3. Network with 2-3 people in similar roles\n")
-        
-        # ATS Tips
-        f.write("\n" + "=" * 70 + "\n")
-        f.write("🤖 ATS (APPLICANT TRACKING SYSTEM) TIPS\n")
-        f.write("=" * 70 + "\n\n")
-        f.write("✅ DO:\n")
-        f.write("   • Use standard section headers (Experience, Education, Skills)\n")
-        f.write("   • Include keywords from the job description\n")
-        f.write("   • Use a clean, simple format\n")
-        f.write("   • Save as PDF for consistency\n\n")
-        
-        f.write("❌ AVOID:\n")
-        f.write("   • Graphics, images, or logos\n")
-        f.write("   • Tables or text boxes\n")
-        f.write("   • Uncommon fonts\n")
-        f.write("   • Headers/footers that might get cut off\n")
-        
-        # Quick Tips based on score
-        f.write("\n" + "=" * 70 + "\n")
-        f.write("💡 QUICK TIPS\n")
-        f.write("=" * 70 + "\n\n")
-        
-        tips = generate_quick_tips(match_result['overall'])
-        for tip in tips:
-            f.write(f"• {tip}\n")
-        
-        # Footer
-        f.write("\n" + "=" * 70 + "\n")
-        f.write("Generated by Resume-JD Matcher\n")
-        f.write("=" * 70 + "\n")
+        f.write(report)
     
     return output_file
 
+def score_rating(score):
+    """Rating label and interpretation used by the text report"""
+    if score >= 80:
+        return "EXCELLENT", "Your resume is very well aligned with this position. Consider applying!"
+    elif score >= 60:
+        return "GOOD", "Your resume has a solid foundation. Minor improvements recommended."
+    elif score >= 40:
+        return "MODERATE", "Significant improvements needed for this role."
+    return "LOW", "This may not be the best fit with your current resume."
+
+def render_match_report(match_result, missing_skills, missing_keywords,
+                        resume_filename, jd_filename):
+    """Render the text match report as a string (same content as save_match_report)"""
+    score = match_result['overall']
+    rating, interpretation = score_rating(score)
+    
+    parts = [TEXT_HEADER.render(
+        generated=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        resume_filename=resume_filename, jd_filename=jd_filename,
+        overall=score, rating=rating, interpretation=interpretation
+    )]
+    
+    # Score Breakdown
+    for category, value in match_result['breakdown'].items():
+        bar = "█" * int(value / 5) + "░" * (20 - int(value / 5))
+        parts.append(f"{category.capitalize():15} {value:6.1f}% |{bar}|\n")
+    parts.append("\n")
+    
+    # Skills Analysis
+    parts.append(TEXT_SKILLS_HEADER)
+    if 'skills' in match_result['breakdown']:
+        parts.append(f"Skills Match: {match_result['breakdown']['skills']:.1f}%\n")
+    
+    if missing_skills:
+        parts.append(f"\nMissing Skills ({len(missing_skills)}):\n")
+        parts.extend(f"  {i}. {skill}\n" for i, skill in enumerate(sorted(missing_skills), 1))
+    else:
+        parts.append("\n✅ All required skills are covered!\n")
+    
+    # Keywords Analysis
+    parts.append(TEXT_KEYWORDS_HEADER)
+    if 'keywords' in match_result['breakdown']:
+        parts.append(f"Keywords Match: {match_result['breakdown']['keywords']:.1f}%\n")
+    
+    if missing_keywords:
+        parts.append(f"\nMissing Keywords ({len(missing_keywords)}):\n")
+        # Group keywords for better readability
+        keywords_list = sorted(missing_keywords)
+        for i in range(0, len(keywords_list), 5):
+            parts.append("  • " + ", ".join(keywords_list[i:i+5]) + "\n")
+    else:
+        parts.append("\n✅ Excellent keyword coverage!\n")
+    
+    # Improvement Recommendations
+    parts.append(TEXT_IMPROVEMENTS_HEADER)
+    if missing_skills:
+        parts.append("1. ADD THESE SKILLS TO YOUR RESUME:\n")
+        parts.extend(f"   • Add '{skill}' to your Skills section\n" for skill in sorted(missing_skills)[:3])
+    
+    if missing_keywords:
+        parts.append("\n2. INCORPORATE THESE KEYWORDS:\n")
+        parts.extend(f"   • Use '{keyword}' in your experience bullets\n"
+                     for keyword in sorted(missing_keywords)[:5])
+    
+    # Fixed advice, ATS tips, then quick tips based on score
+    parts.append(TEXT_STATIC_ADVICE)
+    parts.extend(f"• {tip}\n" for tip in generate_quick_tips(score))
+    parts.append(TEXT_FOOTER)
+    
+    return "".join(parts)
+
 def generate_quick_tips(match_score):
     """Generate quick tips based on match score"""
     tips = []
@@ -184,48 +204,41 @@ def generate_quick_tips(match_score):
     
     return tips
 
-def generate_html_report(match_result, missing_skills, missing_keywords, 
-                        resume_filename, jd_filename, output_dir="../reports"):
-    """Save report as HTML for better viewing (OPTIONAL)"""
-    
-    os.makedirs(output_dir, exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_file = os.path.join(output_dir, f"match_report_{timestamp}.html")
-    
-    # Determine color based on score
-    score_color = "#27ae60" if match_result['overall'] >= 70 else "#e74c3c" if match_result['overall'] < 40 else "#f39c12"
-    
-    html_content = f"""
+# =====================================================
+# HTML REPORT TEMPLATES
+# =====================================================
+
+HTML_HEADER = Template("""
     <!DOCTYPE html>
     <html>
     <head>
         <title>Resume-JD Match Report</title>
         <style>
-            body {{ font-family: Arial, sans-serif; margin: 40px; line-height: 1.6; }}
-            .header {{ background: #2c3e50; color: white; padding: 20px; border-radius: 5px; }}
-            .score {{ font-size: 48px; font-weight: bold; color: {score_color}; }}
-            .section {{ margin: 30px 0; padding: 20px; border-left: 4px solid #3498db; background: #f8f9fa; border-radius: 5px; }}
-            .skill {{ display: inline-block; background: {'#2ecc71' if not missing_skills else '#e74c3c'}; 
-                     color: white; padding: 5px 10px; margin: 5px; border-radius: 3px; }}
-            .tip {{ background: #fff3cd; padding: 10px; border-left: 4px solid #ffc107; margin: 10px 0; border-radius: 3px; }}
-            .badge {{ background: #3498db; color: white; padding: 3px 8px; border-radius: 12px; font-size: 12px; }}
-            table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
-            th, td {{ padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }}
-            th {{ background-color: #f2f2f2; }}
+            body { font-family: Arial, sans-serif; margin: 40px; line-height: 1.6; }
+            .header { background: #2c3e50; color: white; padding: 20px; border-radius: 5px; }
+            .score { font-size: 48px; font-weight: bold; color: {{ score_color }}; }
+            .section { margin: 30px 0; padding: 20px; border-left: 4px solid #3498db; background: #f8f9fa; border-radius: 5px; }
+            .skill { display: inline-block; background: {{ skill_color }}; 
+                     color: white; padding: 5px 10px; margin: 5px; border-radius: 3px; }
+            .tip { background: #fff3cd; padding: 10px; border-left: 4px solid #ffc107; margin: 10px 0; border-radius: 3px; }
+            .badge { background: #3498db; color: white; padding: 3px 8px; border-radius: 12px; font-size: 12px; }
+            table { width: 100%; border-collapse: collapse; margin: 20px 0; }
+            th, td { padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }
+            th { background-color: #f2f2f2; }
         </style>
     </head>
     <body>
         <div class="header">
             <h1>📊 Resume-JD Match Report</h1>
-            <p>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-            <p>Resume: {resume_filename} | JD: {jd_filename}</p>
+            <p>Generated: {{ generated }}</p>
+            <p>Resume: {{ resume_filename }} | JD: {{ jd_filename }}</p>
         </div>
         
         <div class="section">
             <h2>Overall Match Score</h2>
-            <div class="score">{match_result['overall']}%</div>
+            <div class="score">{{ overall }}%</div>
             <p>
-                <span class="badge">{'EXCELLENT' if match_result['overall'] >= 80 else 'GOOD' if match_result['overall'] >= 60 else 'MODERATE' if match_result['overall'] >= 40 else 'NEEDS WORK'}</span>
+                <span class="badge">{{ badge }}</span>
             </p>
         </div>
         
@@ -237,50 +250,36 @@ def generate_html_report(match_result, missing_skills, missing_keywords,
                     <th>Score</th>
                     <th>Progress</th>
                 </tr>
-    """
-    
-    for category, score in match_result['breakdown'].items():
-        bar_width = int(score)
-        html_content += f"""
+    """)
+
+HTML_BREAKDOWN_ROW = Template("""
                 <tr>
-                    <td>{category.capitalize()}</td>
-                    <td>{score}%</td>
+                    <td>{{ category }}</td>
+                    <td>{{ score }}%</td>
                     <td>
                         <div style="width: 200px; background: #ecf0f1; border-radius: 3px;">
-                            <div style="width: {bar_width}%; background: #3498db; height: 20px; border-radius: 3px;"></div>
+                            <div style="width: {{ bar_width }}%; background: #3498db; height: 20px; border-radius: 3px;"></div>
                         </div>
                     </td>
                 </tr>
-        """
-    
-    html_content += f"""
+        """)
+
+HTML_SKILLS_HEADER = """
             </table>
         </div>
         
         <div class="section">
             <h2>Missing Skills</h2>
     """
-    
-    if missing_skills:
-        html_content += "<p>Add these skills to your resume:</p><div>"
-        for skill in sorted(missing_skills):
-            html_content += f'<span class="skill">{skill}</span>'
-        html_content += "</div>"
-    else:
-        html_content += "<p>✅ All required skills are covered!</p>"
-    
-    html_content += f"""
+
+HTML_TIPS_HEADER = """
         </div>
         
         <div class="section">
             <h2>Quick Tips</h2>
     """
-    
-    tips = generate_quick_tips(match_result['overall'])
-    for tip in tips:
-        html_content += f'<div class="tip">{tip}</div>'
-    
-    html_content += """
+
+HTML_FOOTER = """
         </div>
         
         <div class="section">
@@ -301,8 +300,227 @@ def generate_html_report(match_result, missing_skills, missing_keywords,
     </body>
     </html>
     """
+
+# Repeated per skill/tip, so these are plain format strings
+HTML_SKILL = '<span class="skill">%s</span>'
+HTML_TIP = '<div class="tip">%s</div>'
+
+# =====================================================
+# HTML REPORT
+# =====================================================
+
+def generate_html_report(match_result, missing_skills, missing_keywords, 
+                        resume_filename, jd_filename, output_dir="../reports"):
+    """Save report as HTML for better viewing (OPTIONAL)"""
+    
+    os.makedirs(output_dir, exist_ok=True)
+    html_content = render_html_report(match_result, missing_skills, missing_keywords,
+                                      resume_filename, jd_filename)
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_file = os.path.join(output_dir, f"match_report_{timestamp}_{content_hash(html_content)[:8]}.html")
     
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write(html_content)
     
-    return output_file
\ No newline at end of file
+    return output_file
+
+def score_badge(score):
+    """Badge label shown under the HTML score"""
+    return 'EXCELLENT' if score >= 80 else 'GOOD' if score >= 60 else 'MODERATE' if score >= 40 else 'NEEDS WORK'
+
+def score_color(score):
+    """Green / amber / red for a match score"""
+    return "#27ae60" if score >= 70 else "#e74c3c" if score < 40 else "#f39c12"
+
+def render_html_report(match_result, missing_skills, missing_keywords,
+                       resume_filename, jd_filename):
+    """Render the HTML match report as a string (same content as generate_html_report)"""
+    score = match_result['overall']
+    
+    parts = [HTML_HEADER.render(
+        score_color=score_color(score),
+        skill_color='#2ecc71' if not missing_skills else '#e74c3c',
+        generated=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        resume_filename=resume_filename, jd_filename=jd_filename,
+        overall=score, badge=score_badge(score)
+    )]
+    
+    for category, value in match_result['breakdown'].items():
+        parts.append(HTML_BREAKDOWN_ROW.render(
+            category=category.capitalize(), score=value, bar_width=int(value)
+        ))
+    
+    parts.append(HTML_SKILLS_HEADER)
+    if missing_skills:
+        parts.append("<p>Add these skills to your resume:</p><div>")
+        parts.extend(HTML_SKILL % skill for skill in sorted(missing_skills))
+        parts.append("</div>")
+    else:
+        parts.append("<p>✅ All required skills are covered!</p>")
+    
+    parts.append(HTML_TIPS_HEADER)
+    parts.extend(HTML_TIP % tip for tip in generate_quick_tips(score))
+    parts.append(HTML_FOOTER)
+    
+    return "".join(parts)
+
+# =====================================================
+# BATCH HTML REPORT
+# =====================================================
+
+BATCH_HEADER = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <title>Resume Ranking Report</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 40px; line-height: 1.6; }
+        .header { background: #2c3e50; color: white; padding: 20px; border-radius: 5px; }
+        table { width: 100%; border-collapse: collapse; margin: 20px 0; }
+        th, td { padding: 8px 12px; text-align: left; border-bottom: 1px solid #ddd; }
+        th { background-color: #f2f2f2; position: sticky; top: 0; }
+        .skill { display: inline-block; background: #e74c3c; color: white; padding: 2px 6px; margin: 2px; border-radius: 3px; font-size: 12px; }
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>📊 Resume Ranking Report</h1>
+        <p>Generated: {{ generated }}</p>
+        <p>JD: {{ jd_filename }}</p>
+    </div>
+    <table>
+        <tr>
+            <th>Rank</th>
+            <th>Candidate</th>
+            <th>Overall</th>
+            <th>Similarity</th>
+            <th>Skills</th>
+            <th>Keywords</th>
+            <th>Experience</th>
+            <th>Missing Skills</th>
+        </tr>
+""")
+
+BATCH_ROW = Template("""        <tr>
+            <td>{{ rank }}</td>
+            <td>{{ candidate }}</td>
+            <td style="color: {{ score_color }}; font-weight: bold;">{{ overall }}%</td>
+            <td>{{ similarity }}%</td>
+            <td>{{ skills }}%</td>
+            <td>{{ keywords }}%</td>
+            <td>{{ experience }}%</td>
+            <td>{{ missing_skills }}</td>
+        </tr>
+""")
+
+BATCH_FOOTER = Template("""    </table>
+    <p>{{ count }} candidates ranked.</p>
+</body>
+</html>
+""")
+
+# Missing skills listed per row in the batch report
+BATCH_MAX_SKILLS = 8
+
+def iter_batch_html_report(candidates, jd_filename):
+    """
+    Yield an HTML ranking report for many candidates, one row at a time.
+
+    candidates is any iterable of rank_resumes()-style dicts ("id",
+    "overall", "breakdown", "details") in the order they should appear; it
+    is consumed lazily, so a generator keeps memory flat however many
+    resumes are ranked.
+    """
+    yield BATCH_HEADER.render(generated=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                              jd_filename=html.escape(str(jd_filename)))
+    
+    count = 0
+    for count, candidate in enumerate(candidates, 1):
+        breakdown = candidate.get('breakdown', {})
+        missing = sorted(candidate.get('details', {}).get('missing_skills', []))
+        skills_html = "".join(HTML_SKILL % html.escape(skill)
+                              for skill in missing[:BATCH_MAX_SKILLS])
+        if len(missing) > BATCH_MAX_SKILLS:
+            skills_html += f" +{len(missing) - BATCH_MAX_SKILLS} more"
+        
+        yield BATCH_ROW.render(
+            rank=count,
+            candidate=html.escape(str(candidate.get('id', count))),
+            score_color=score_color(candidate['overall']),
+            overall=candidate['overall'],
+            similarity=breakdown.get('similarity', 0),
+            skills=breakdown.get('skills', 0),
+            keywords=breakdown.get('keywords', 0),
+            experience=breakdown.get('experience', 0),
+            missing_skills=skills_html or "✅"
+        )
+    
+    yield BATCH_FOOTER.render(count=count)
+
+def write_batch_html_report(candidates, output_file, jd_filename="Job Description"):
+    """Stream the batch ranking report to output_file and return its path"""
+    directory = os.path.dirname(output_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        for chunk in iter_batch_html_report(candidates, jd_filename):
+            f.write(chunk)
+    return output_file
+
+# =====================================================
+# BACKGROUND ARCHIVING
+# =====================================================
+
+# Set RESUMEALIGN_REPORT_ARCHIVE to a directory to keep a copy of every
+# report in a content-addressed ReportStore there (see report_store.py);
+# unset, reports only exist in memory
+ARCHIVE_DIR = os.environ.get("RESUMEALIGN_REPORT_ARCHIVE")
+
+_archive_executor = None
+_archive_lock = threading.Lock()
+
+def report_key(match_result, missing_skills, missing_keywords,
+               resume_filename, jd_filename):
+    """Content hash of everything a report is rendered from"""
+    return content_hash(json.dumps(
+        [match_result['overall'], match_result['breakdown'], sorted(missing_skills),
+         sorted(missing_keywords), resume_filename, jd_filename],
+        sort_keys=True, default=str
+    ))
+
+def archive_reports(match_result, missing_skills, missing_keywords,
+                    resume_filename, jd_filename, output_dir=None, key=None):
+    """
+    Store the text and HTML reports on a background thread.
+    
+    Reports are kept under key (by default report_key() of the inputs), so
+    the same analysis is stored once however often it is archived. Returns
+    a Future resolving to (text_path, html_path), or None when no archive
+    directory is configured.
+    """
+    global _archive_executor
+    output_dir = output_dir or ARCHIVE_DIR
+    if not output_dir:
+        return None
+    key = key or report_key(match_result, missing_skills, missing_keywords,
+                            resume_filename, jd_filename)
+    
+    with _archive_lock:
+        if _archive_executor is None:
+            # One writer thread: archiving never competes with analyses for I/O
+            _archive_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="report-archive")
+    
+    def write():
+        try:
+            store = get_report_store(output_dir)
+            return (
+                store.put(key, "txt", render_match_report(match_result, missing_skills, missing_keywords,
+                                                          resume_filename, jd_filename)),
+                store.put(key, "html", render_html_report(match_result, missing_skills, missing_keywords,
+                                                          resume_filename, jd_filename))
+            )
+        except Exception as e:
+            print(f"Report archive error: {e}")
+            return None
+    
+    return _archive_executor.submit(write)
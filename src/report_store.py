@@ -0,0 +1,233 @@
+# src/report_store.py
+"""
+Content-addressed, gzip-compressed report storage.
+
+Reports are stored under the hash of the analysis they describe instead of
+a timestamp, so concurrent analyses can never overwrite each other and
+re-archiving the same analysis just refreshes the existing file:
+
+    <root>/<key[:2]>/<key[2:4]>/<key>.<kind>.gz
+
+Two shard levels keep every directory small (256 x 256 fan-out). Retention
+is bounded by age and by total size; gc() enforces both and runs
+automatically every GC_INTERVAL writes.
+
+    python src/report_store.py <root>          # usage summary
+    python src/report_store.py <root> --gc     # apply retention now
+"""
+
+import os
+import re
+import gzip
+import time
+import threading
+
+# =====================================================
+# SETTINGS
+# =====================================================
+
+# Reports not written or re-archived for this many days are deleted (0 = keep)
+RETENTION_DAYS = float(os.environ.get("RESUMEALIGN_REPORT_RETENTION_DAYS", "30"))
+
+# Oldest reports are deleted once the store grows past this (0 = unbounded)
+MAX_STORE_MB = float(os.environ.get("RESUMEALIGN_REPORT_MAX_MB", "512"))
+
+COMPRESS_LEVEL = 6
+GC_INTERVAL = 100
+
+# Leftover temp files from interrupted writes are removed after this long
+STALE_TMP_SECONDS = 3600
+
+_KEY = re.compile(r"[0-9a-f]{8,128}")
+_KIND = re.compile(r"[a-z0-9]{1,8}")
+
+# =====================================================
+# STORE
+# =====================================================
+
+class ReportStore:
+    """Reports keyed by content hash, sharded on disk, with retention"""
+
+    def __init__(self, root, compress=True, retention_days=RETENTION_DAYS,
+                 max_mb=MAX_STORE_MB, gc_interval=GC_INTERVAL):
+        self.root = root
+        self.compress = compress
+        self.retention_days = retention_days
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.gc_interval = gc_interval
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def path(self, key, kind):
+        """Where the report for key is (or would be) stored"""
+        if not _KEY.fullmatch(key) or not _KIND.fullmatch(kind):
+            raise ValueError(f"Invalid report key/kind: {key!r}, {kind!r}")
+        name = f"{key}.{kind}.gz" if self.compress else f"{key}.{kind}"
+        return os.path.join(self.root, key[:2], key[2:4], name)
+
+    def exists(self, key, kind):
+        return os.path.exists(self.path(key, kind))
+
+    def put(self, key, kind, content):
+        """
+        Store content (str) under key and return its path.
+
+        An existing report for key is kept and only has its modification
+        time refreshed, which also restarts its retention period.
+        """
+        path = self.path(key, kind)
+        if os.path.exists(path):
+            os.utime(path)
+        else:
+            data = content.encode("utf-8")
+            if self.compress:
+                data = gzip.compress(data, COMPRESS_LEVEL, mtime=0)
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        with self._lock:
+            self._writes += 1
+            run_gc = self.gc_interval and self._writes % self.gc_interval == 0
+        if run_gc:
+            self.gc()
+        return path
+
+    def get(self, key, kind):
+        """The stored report as a string, or None"""
+        try:
+            with open(self.path(key, kind), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        if self.compress:
+            data = gzip.decompress(data)
+        return data.decode("utf-8")
+
+    def delete(self, key, kind):
+        try:
+            os.remove(self.path(key, kind))
+            return True
+        except FileNotFoundError:
+            return False
+
+    # -------------------------------------------------
+    # Retention
+    # -------------------------------------------------
+
+    def _scan(self):
+        """(path, size, mtime) of every file below root, shards included"""
+        stack = [self.root]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except FileNotFoundError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        info = entry.stat()
+                        yield entry.path, info.st_size, info.st_mtime
+
+    def usage(self):
+        """{"reports", "bytes"} currently stored"""
+        reports = total = 0
+        for path, size, _ in self._scan():
+            if not path.endswith(".tmp"):
+                reports += 1
+                total += size
+        return {"reports": reports, "bytes": total}
+
+    def gc(self, now=None):
+        """
+        Delete reports past the retention age, then the oldest ones until
+        the store fits in max_bytes. Returns counts of what was removed.
+        """
+        now = now or time.time()
+        max_age = self.retention_days * 86400 if self.retention_days else None
+
+        removed = freed = 0
+        kept = []
+        for path, size, mtime in self._scan():
+            if path.endswith(".tmp"):
+                expired = now - mtime > STALE_TMP_SECONDS
+            else:
+                expired = max_age is not None and now - mtime > max_age
+            if expired:
+                if self._remove(path):
+                    removed += 1
+                    freed += size
+            elif not path.endswith(".tmp"):
+                kept.append((mtime, size, path))
+
+        kept_bytes = sum(size for _, size, _ in kept)
+        if self.max_bytes and kept_bytes > self.max_bytes:
+            kept.sort()
+            evict = 0
+            while evict < len(kept) and kept_bytes > self.max_bytes:
+                _, size, path = kept[evict]
+                evict += 1
+                kept_bytes -= size
+                if self._remove(path):
+                    removed += 1
+                    freed += size
+            kept = kept[evict:]
+
+        self._remove_empty_shards()
+        return {"removed": removed, "freed_bytes": freed,
+                "reports": len(kept), "bytes": kept_bytes}
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _remove_empty_shards(self):
+        # Deepest first, so emptied second-level shards free their parents
+        for directory, _, _ in sorted(os.walk(self.root), key=lambda w: -len(w[0])):
+            if directory != self.root:
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    pass
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_report_store(root):
+    """The process-wide store for root, so the write counter for GC is shared"""
+    with _stores_lock:
+        store = _stores.get(root)
+        if store is None:
+            store = _stores[root] = ReportStore(root)
+        return store
+
+# =====================================================
+# COMMAND LINE
+# =====================================================
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or garbage-collect a report store")
+    parser.add_argument("root")
+    parser.add_argument("--gc", action="store_true", help="apply the retention policy now")
+    parser.add_argument("--retention-days", type=float, default=RETENTION_DAYS)
+    parser.add_argument("--max-mb", type=float, default=MAX_STORE_MB)
+    args = parser.parse_args()
+
+    store = ReportStore(args.root, retention_days=args.retention_days, max_mb=args.max_mb)
+    if args.gc:
+        result = store.gc()
+        print(f"Removed {result['removed']} files ({result['freed_bytes'] / 1024:.0f} KB), "
+              f"{result['reports']} reports ({result['bytes'] / 1024:.0f} KB) kept")
+    else:
+        usage = store.usage()
+        print(f"{usage['reports']} reports, {usage['bytes'] / 1024:.0f} KB in {args.root}")
@@ -1,149 +1,57 @@
-import re
+from skill_taxonomy import get_taxonomy_index
 
 # =====================================================
-# BASE SKILLS DATABASE
+# SKILL TAXONOMY
 # =====================================================
 
-BASE_SKILLS = {
-
-    # Programming
-    "python",
-    "sql",
-    "java",
-    "javascript",
-    "c++",
-    "c#",
-    "r",
-
-    # Analytics
-    "tableau",
-    "power bi",
-    "excel",
-    "pandas",
-    "numpy",
-
-    # Cloud
-    "aws",
-    "azure",
-    "gcp",
-
-    # Databases
-    "mysql",
-    "postgresql",
-    "mongodb",
-
-    # DevOps
-    "docker",
-    "kubernetes",
-    "git",
-
-    # Marketing
-    "seo",
-    "sem",
-    "google ads",
-    "google analytics",
-    "ga4",
-    "hubspot",
-    "salesforce",
-    "meta",
-    "linkedin",
-    "email marketing",
-    "cro",
-    "conversion rate optimization",
-    "looker studio"
-}
+# Skills, categories and aliases live in data/skill_taxonomy.json (or the
+# file named by RESUMEALIGN_SKILL_TAXONOMY). They are compiled once into a
+# cached index that is memory-mapped on first use.
 
-# =====================================================
-# ALIASES
-# =====================================================
-
-ALIASES = {
-
-    "powerbi": "power bi",
-    "power_bi": "power bi",
-
-    "google analytics 4": "ga4",
+def get_skill_automaton():
+    """Automaton over every skill name in the taxonomy"""
+    return get_taxonomy_index().skills
 
-    "reactjs": "react",
-    "node.js": "nodejs",
+def get_skill_category(skill):
+    """Category of a skill in the taxonomy, or None if it is unknown"""
+    return get_taxonomy_index().category(skill)
 
-    "machine_learning": "machine learning",
-    "deep_learning": "deep learning",
-
-    "business_intelligence": "business intelligence",
-
-    "cplusplus": "c++",
-    "csharp": "c#",
-
-    "a/b testing": "ab testing",
-    "a b testing": "ab testing"
-}
+def __getattr__(name):
+    # BASE_SKILLS / ALIASES stay importable, built from the index on demand
+    if name == "BASE_SKILLS":
+        return set(get_taxonomy_index().skills.phrases)
+    if name == "ALIASES":
+        aliases = get_taxonomy_index().aliases
+        return dict(zip(aliases.phrases, aliases.labels))
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # =====================================================
 # NORMALIZE
 # =====================================================
 
 def normalize_text(text):
+    """
+    Lowercase, collapse whitespace and map aliases to canonical skills.
+
+    All aliases are replaced in one automaton pass (leftmost-longest, whole
+    words only), so the cost depends on text length, not alias count.
+    """
 
     if not text:
         return ""
 
-    text = text.lower()
-
-    for old, new in ALIASES.items():
-        text = text.replace(old, new)
-
-    text = re.sub(r"\s+", " ", text)
+    text = " ".join(text.lower().split())
 
-    return text.strip()
+    return get_taxonomy_index().aliases.substitute(text)
 
 # =====================================================
 # EXTRACT JD SKILLS DYNAMICALLY
 # =====================================================
 
 def extract_dynamic_skills(text):
+    """Kept for callers of the old API; the taxonomy has a single skill list"""
 
-    text = normalize_text(text)
-
-    skills = set()
-
-    patterns = [
-
-        r"google ads",
-        r"google analytics",
-        r"ga4",
-        r"looker studio",
-        r"hubspot",
-        r"salesforce",
-        r"seo",
-        r"sem",
-        r"meta",
-        r"linkedin",
-        r"email marketing",
-        r"cro",
-        r"conversion rate optimization",
-        r"ab testing",
-        r"customer acquisition",
-        r"campaign strategy",
-        r"budget management",
-        r"team management",
-
-        r"python",
-        r"sql",
-        r"tableau",
-        r"power bi",
-        r"aws",
-        r"azure",
-        r"docker",
-        r"kubernetes"
-    ]
-
-    for pattern in patterns:
-
-        if re.search(rf"\b{re.escape(pattern)}\b", text):
-            skills.add(pattern)
-
-    return skills
+    return extract_skills(text)
 
 # =====================================================
 # EXTRACT SKILLS
@@ -153,19 +61,8 @@ def extract_skills(text):
 
     text = normalize_text(text)
 
-    found = set()
-
-    for skill in BASE_SKILLS:
-
-        if re.search(
-            rf"\b{re.escape(skill)}\b",
-            text
-        ):
-            found.add(skill)
-
-    dynamic = extract_dynamic_skills(text)
-
-    return found.union(dynamic)
+    # One pass finds every taxonomy skill
+    return get_skill_automaton().find_all(text)
 
 # =====================================================
 # MATCH
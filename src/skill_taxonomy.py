@@ -0,0 +1,162 @@
+# src/skill_taxonomy.py
+import os
+import csv
+import json
+import hashlib
+import threading
+
+from cache_utils import CACHE_DIR
+from phrase_automaton import PhraseAutomaton
+
+# =====================================================
+# SETTINGS
+# =====================================================
+
+DEFAULT_TAXONOMY_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "data", "skill_taxonomy.json"
+)
+TAXONOMY_FILE = os.environ.get("RESUMEALIGN_SKILL_TAXONOMY", DEFAULT_TAXONOMY_FILE)
+INDEX_DIR = os.path.join(CACHE_DIR, "skill_index")
+
+# Bump when the way a taxonomy is compiled changes
+INDEX_FORMAT = "1"
+
+# =====================================================
+# LOAD TAXONOMY FILE
+# =====================================================
+
+def _clean_term(term):
+    return " ".join(str(term).lower().split())
+
+def load_taxonomy(path=TAXONOMY_FILE):
+    """
+    Read a skill taxonomy from JSON or CSV.
+
+    JSON: {"skills": [{"name", "category", "aliases": [...]}, ...],
+           "aliases": {alias: canonical}}  (top-level aliases are optional
+           and may point at terms that are not skills themselves)
+    CSV:  header "name,category,aliases" with aliases separated by "|"
+
+    Returns {"skills": {name: category}, "aliases": {alias: canonical}}.
+    """
+    skills = {}
+    aliases = {}
+
+    def add(name, category, alias_list):
+        name = _clean_term(name)
+        if not name:
+            return
+        skills.setdefault(name, category or "")
+        for alias in alias_list:
+            alias = _clean_term(alias)
+            if alias and alias != name:
+                aliases.setdefault(alias, name)
+
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                alias_list = (row.get("aliases") or "").split("|")
+                add(row.get("name", ""), (row.get("category") or "").strip(), alias_list)
+    else:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        for entry in data.get("skills", []):
+            add(entry.get("name", ""), entry.get("category", ""), entry.get("aliases", []))
+        for alias, canonical in data.get("aliases", {}).items():
+            alias = _clean_term(alias)
+            if alias:
+                aliases.setdefault(alias, _clean_term(canonical))
+
+    return {"skills": skills, "aliases": aliases}
+
+# =====================================================
+# COMPILED INDEX
+# =====================================================
+
+class TaxonomyIndex:
+    """Skill and alias automata for one taxonomy file"""
+
+    def __init__(self, skills, aliases):
+        # skills: phrase = skill name, label = category
+        # aliases: phrase = alias, label = canonical skill
+        self.skills = skills
+        self.aliases = aliases
+
+    def category(self, skill):
+        index = self.skills.lookup(skill)
+        return self.skills.labels[index] if index >= 0 else None
+
+def _taxonomy_digest(path):
+    digest = hashlib.sha256(INDEX_FORMAT.encode())
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+def build_index(path=TAXONOMY_FILE, index_dir=INDEX_DIR):
+    """Compile a taxonomy file into index files and return their directory"""
+    target = os.path.join(index_dir, _taxonomy_digest(path))
+    taxonomy = load_taxonomy(path)
+
+    os.makedirs(target, exist_ok=True)
+    PhraseAutomaton(
+        list(taxonomy["skills"]), labels=list(taxonomy["skills"].values())
+    ).save(os.path.join(target, "skills.idx"))
+    PhraseAutomaton(
+        list(taxonomy["aliases"]), labels=list(taxonomy["aliases"].values())
+    ).save(os.path.join(target, "aliases.idx"))
+    return target
+
+def open_index(path=TAXONOMY_FILE, index_dir=INDEX_DIR):
+    """Memory-map the compiled index for a taxonomy, building it if missing"""
+    target = os.path.join(index_dir, _taxonomy_digest(path))
+    skills_file = os.path.join(target, "skills.idx")
+    aliases_file = os.path.join(target, "aliases.idx")
+
+    if not (os.path.exists(skills_file) and os.path.exists(aliases_file)):
+        try:
+            build_index(path, index_dir)
+        except OSError as e:
+            # Read-only deployments still work, they just compile in memory
+            print(f"Skill index not cached: {e}")
+            taxonomy = load_taxonomy(path)
+            return TaxonomyIndex(
+                PhraseAutomaton(list(taxonomy["skills"]), labels=list(taxonomy["skills"].values())),
+                PhraseAutomaton(list(taxonomy["aliases"]), labels=list(taxonomy["aliases"].values()))
+            )
+
+    return TaxonomyIndex(
+        PhraseAutomaton.load(skills_file),
+        PhraseAutomaton.load(aliases_file)
+    )
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_taxonomy_index():
+    """Return the process-wide index for TAXONOMY_FILE, opened on first use"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = open_index()
+    return _index
+
+# =====================================================
+# COMMAND LINE
+# =====================================================
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    source = sys.argv[1] if len(sys.argv) > 1 else TAXONOMY_FILE
+
+    start = time.perf_counter()
+    directory = build_index(source)
+    print(f"Compiled {source} -> {directory} in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    index = open_index(source)
+    print(f"Loaded {len(index.skills)} skills, {len(index.aliases)} aliases "
+          f"in {(time.perf_counter() - start) * 1000:.1f}ms")
@@ -0,0 +1,42 @@
+# src/templates.py
+"""
+Minimal precompiled text templates.
+
+A template is parsed once into alternating literal chunks and placeholder
+names; rendering only looks the values up and joins the pieces once, with
+no re-parsing and no repeated string concatenation. Placeholders look like
+{{ name }}; single braces (CSS, JSON) are left alone. Values are inserted
+with str() as-is, so escape user text before passing it in.
+"""
+
+import re
+
+_PLACEHOLDER = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+
+class Template:
+    """A template parsed once into literal and placeholder parts"""
+
+    def __init__(self, source):
+        self.source = source
+        self.literals = []
+        self.names = []
+
+        pos = 0
+        for match in _PLACEHOLDER.finditer(source):
+            self.literals.append(source[pos:match.start()])
+            self.names.append(match.group(1))
+            pos = match.end()
+        self.literals.append(source[pos:])
+
+    def render(self, context=None, **values):
+        """Render to a single string; missing values raise KeyError"""
+        if context:
+            values = {**context, **values}
+        # Literals at even positions, values at odd, then one join
+        parts = [None] * (2 * len(self.names) + 1)
+        parts[::2] = self.literals
+        parts[1::2] = [str(values[name]) for name in self.names]
+        return "".join(parts)
+
+    def __repr__(self):
+        return f"Template({len(self.names)} placeholders)"
@@ -1,94 +1,212 @@
 # src/text_cleaner.py
 import re
 
+from cache_utils import LRUCache, content_hash
+from metrics import register_cache
+from phrase_automaton import PhraseAutomaton, at_word_boundary
+
+# =====================================================
+# PRECOMPILED PATTERNS
+# =====================================================
+
+# Non-ASCII runs, null bytes and separators all become spaces. (The old
+# bullet pattern only held non-ASCII characters, and \r/\n rewrites were
+# undone by the whitespace collapse, so neither needs its own pass.)
+_SPACE_OUT = re.compile(r'[^\x01-\x7F]+|[\|\/\\]+')
+
+_SINGLE_CHAR = re.compile(r'\s+[a-zA-Z]\s+')
+_NUMBER_WORD = re.compile(r'\s+\d+\s+')
+
+# A match can only start at the beginning of a word, so \b lets the regex
+# skip mid-word start positions without changing what it finds
+_CONCATENATED = [
+    (word, re.compile(r'\b(\w+)(' + word + r')(\w+)'))
+    for word in ('time', 'summary', 'position', 'manager', 'location', 'department')
+]
+
+_WHITESPACE = re.compile(r'\s+')
+_SENTENCE_BOUNDARY = re.compile(r'\.([A-Z])')
+
+# =====================================================
+# MEMO
+# =====================================================
+
+_clean_memo = LRUCache(maxsize=256)
+_keyword_memo = LRUCache(maxsize=256)
+
+register_cache("clean_text", _clean_memo.stats)
+register_cache("clean_text_for_keywords", _keyword_memo.stats)
+
+# =====================================================
+# CLEANING
+# =====================================================
+
 def clean_text(text):
     """
     Clean text by removing garbage, fixing formatting, and preparing for analysis
     """
     if not text:
         return ""
-    
-    # Remove common PDF/OCR garbage
-    text = re.sub(r'[^\x00-\x7F]+', ' ', text)  # Remove non-ASCII
-    text = re.sub(r'\x00', ' ', text)  # Remove null bytes
-    
-    # Remove common garbage patterns
-    text = re.sub(r'[•·●■◆▪►○●□]', ' ', text)  # Remove bullets
-    text = re.sub(r'[\|\/\\]', ' ', text)  # Remove separators
-    
-    # Fix line breaks
-    text = text.replace('\r\n', '\n')
-    text = text.replace('\r', '\n')
-    
+
+    key = content_hash(text)
+    cleaned = _clean_memo.get(key)
+    if cleaned is None:
+        cleaned = _clean_text(text)
+        _clean_memo.put(key, cleaned)
+    return cleaned
+
+def _clean_text(text):
+    # Remove common PDF/OCR garbage and separators
+    text = _SPACE_OUT.sub(' ', text)
+
     # Remove standalone single characters (but keep "a" and "i" in context)
-    text = re.sub(r'\s+[a-zA-Z]\s+', ' ', text)
-    
+    text = _SINGLE_CHAR.sub(' ', text)
+
     # Remove words that are just numbers
-    text = re.sub(r'\s+\d+\s+', ' ', text)
-    
+    text = _NUMBER_WORD.sub(' ', text)
+
     # Fix common concatenated words
-    text = re.sub(r'(\w+)(time)(\w+)', r'\1 \2 \3', text)
-    text = re.sub(r'(\w+)(summary)(\w+)', r'\1 \2 \3', text)
-    text = re.sub(r'(\w+)(position)(\w+)', r'\1 \2 \3', text)
-    text = re.sub(r'(\w+)(manager)(\w+)', r'\1 \2 \3', text)
-    text = re.sub(r'(\w+)(location)(\w+)', r'\1 \2 \3', text)
-    text = re.sub(r'(\w+)(department)(\w+)', r'\1 \2 \3', text)
-    
-    # Remove multiple spaces
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Remove leading/trailing spaces
-    text = text.strip()
-    
+    for word, pattern in _CONCATENATED:
+        if word in text:
+            text = pattern.sub(r'\1 \2 \3', text)
+
+    # Remove multiple spaces and leading/trailing spaces
+    text = _WHITESPACE.sub(' ', text).strip()
+
     # Fix sentence boundaries
-    text = re.sub(r'\.([A-Z])', r'. \1', text)
-    
+    text = _SENTENCE_BOUNDARY.sub(r'. \1', text)
+
     # Lowercase for consistency
-    text = text.lower()
-    
-    return text
+    return text.lower()
+
+# =====================================================
+# KEYWORD CLEANING
+# =====================================================
+
+# Remove job posting boilerplate phrases
+BOILERPLATE = [
+    'we are seeking', 'we are looking for', 'we are hiring',
+    'ideal candidate', 'candidate should have', 'candidate must have',
+    'candidate possesses', 'qualified candidate', 'successful candidate',
+    'responsible for', 'duties include', 'key responsibilities',
+    'requirements include', 'qualifications include', 'about us',
+    'why join us', 'what we offer', 'benefits include', 'perks include',
+    'job title', 'position type', 'employment type', 'work location',
+    'reports to', 'directly report', 'team member', 'cross functional'
+]
+
+# Remove common words that appear at start of lines
+GARBAGE_STARTS = ['summary', 'position summary', 'type', 'full time',
+                  'full time position', 'location', 'department']
+
+# Remove standalone words that are likely garbage
+GARBAGE_WORDS = ['summarywe', 'timeposition', 'positionwe', 'weare', 'areyou',
+                 'positiontype', 'typedepartment', 'departmentlocation',
+                 'candidate', 'ideal', 'possesses', 'qualifications']
 
-def clean_text_for_keywords(text):
+# =====================================================
+# ONE-PASS PHRASE REMOVER
+# =====================================================
+
+_PHRASE, _LEADING, _FRAGMENT = 1, 2, 4
+
+class PhraseRemover:
+    """
+    Removes boilerplate with a single automaton pass over the text.
+
+    phrases   - removed wherever they occur as whole words
+    leading   - removed (with the whitespace after them) only at the start
+                of the text; several may be stripped one after another
+    fragments - removed wherever they occur, even inside longer words
+
+    Overlapping matches are resolved leftmost-longest.
+    """
+
+    def __init__(self, phrases=(), leading=(), fragments=()):
+        kinds = {}
+        for group, kind in ((phrases, _PHRASE), (leading, _LEADING), (fragments, _FRAGMENT)):
+            for phrase in group:
+                phrase = phrase.lower()
+                kinds[phrase] = kinds.get(phrase, 0) | kind
+
+        # Boundaries depend on the kind, so the automaton itself does not check them
+        self.automaton = PhraseAutomaton(list(kinds), word_boundary=False)
+        self._kinds = [kinds[phrase] for phrase in self.automaton.phrases]
+
+    def remove(self, text):
+        removable = []
+        leading = {}
+        for start, end, index in self.automaton.iter_matches(text):
+            kind = self._kinds[index]
+            if kind & _LEADING and end < len(text) and text[end].isspace():
+                leading[start] = max(end, leading.get(start, 0))
+            if kind & _FRAGMENT or (kind & _PHRASE and at_word_boundary(text, start)
+                                    and at_word_boundary(text, end)):
+                removable.append((start, end))
+
+        # Strip a chain of leading phrases, each followed by whitespace
+        head = 0
+        while head in leading:
+            head = leading[head]
+            while head < len(text) and text[head].isspace():
+                head += 1
+
+        parts = []
+        pos = head
+        for start, end in sorted(removable, key=lambda m: (m[0], -m[1])):
+            if start >= pos:
+                parts.append(text[pos:start])
+                pos = end
+        parts.append(text[pos:])
+        return "".join(parts)
+
+def _lists_fingerprint():
+    return content_hash(*("\n".join(words) for words in (BOILERPLATE, GARBAGE_STARTS, GARBAGE_WORDS)))
+
+_remover = PhraseRemover(BOILERPLATE, GARBAGE_STARTS, GARBAGE_WORDS)
+_boilerplate_fingerprint = _lists_fingerprint()
+_NON_LETTERS = re.compile(r'[^a-z\s]')
+
+def configure_boilerplate(phrases=None, leading=None, fragments=None):
+    """Replace any of the boilerplate lists used by clean_text_for_keywords"""
+    global _remover, _boilerplate_fingerprint, BOILERPLATE, GARBAGE_STARTS, GARBAGE_WORDS
+    BOILERPLATE = list(phrases) if phrases is not None else BOILERPLATE
+    GARBAGE_STARTS = list(leading) if leading is not None else GARBAGE_STARTS
+    GARBAGE_WORDS = list(fragments) if fragments is not None else GARBAGE_WORDS
+    _remover = PhraseRemover(BOILERPLATE, GARBAGE_STARTS, GARBAGE_WORDS)
+    _boilerplate_fingerprint = _lists_fingerprint()
+    _keyword_memo.clear()
+
+def boilerplate_fingerprint():
+    """Hash of the current boilerplate lists (part of the match result cache key)"""
+    return _boilerplate_fingerprint
+
+def clean_text_for_keywords(text, already_clean=False):
     """
     Extra cleaning specifically for keyword extraction
+
+    Pass already_clean=True for clean_text() output to skip that step.
+    clean_text is not strictly idempotent, so the flag is part of the key.
     """
-    text = clean_text(text)
-    
-    # Remove job posting boilerplate phrases
-    boilerplate = [
-        'we are seeking', 'we are looking for', 'we are hiring', 
-        'ideal candidate', 'candidate should have', 'candidate must have',
-        'candidate possesses', 'qualified candidate', 'successful candidate',
-        'responsible for', 'duties include', 'key responsibilities',
-        'requirements include', 'qualifications include', 'about us',
-        'why join us', 'what we offer', 'benefits include', 'perks include',
-        'job title', 'position type', 'employment type', 'work location',
-        'reports to', 'directly report', 'team member', 'cross functional'
-    ]
-    
-    for phrase in boilerplate:
-        text = re.sub(r'\b' + phrase + r'\b', '', text, flags=re.IGNORECASE)
-    
-    # Remove common words that appear at start of lines
-    garbage_starts = ['summary', 'position summary', 'type', 'full time', 
-                      'full time position', 'location', 'department']
-    
-    for garbage in garbage_starts:
-        text = re.sub(r'^' + garbage + r'\s+', '', text, flags=re.MULTILINE)
-    
-    # Remove standalone words that are likely garbage
-    garbage_words = ['summarywe', 'timeposition', 'positionwe', 'weare', 'areyou',
-                     'positiontype', 'typedepartment', 'departmentlocation',
-                     'candidate', 'ideal', 'possesses', 'qualifications']
-    
-    for word in garbage_words:
-        text = text.replace(word, '')
-    
+    key = content_hash(str(already_clean), text or "")
+    cleaned = _keyword_memo.get(key)
+    if cleaned is None:
+        cleaned = _clean_text_for_keywords(text, already_clean)
+        _keyword_memo.put(key, cleaned)
+    return cleaned
+
+def _clean_text_for_keywords(text, already_clean=False):
+    if not already_clean:
+        text = clean_text(text)
+
+    # Boilerplate phrases, leading labels and garbage words in one pass
+    text = _remover.remove(text)
+
     # Remove any remaining weird characters
-    text = re.sub(r'[^a-z\s]', ' ', text)
-    text = re.sub(r'\s+', ' ', text)
-    
+    text = _NON_LETTERS.sub(' ', text)
+    text = _WHITESPACE.sub(' ', text)
+
     # Remove very short words (less than 3 chars) that might be leftover garbage
     text = ' '.join([w for w in text.split() if len(w) >= 3])
-    
-    return text
\ No newline at end of file
+
+    return text